@@ -1,26 +1,355 @@
 # api_bp.py
-from flask import Blueprint, jsonify, request
+import csv
+import hashlib
+import io
+import json
+from datetime import timezone
+from flask import Blueprint, current_app, request, stream_with_context
 from flask_login import login_required, current_user, logout_user
-from db_instance import db
-from models import User, News
+from db_instance import db, mark_primary_write
+from models import (User, News, adjust_news_count, bump_table_version, record_news_changes, table_version,
+                    utcnow)
+from utils.cache import invalidate_news, invalidate_user, response_cache
+from utils.changefeed import ChangesExpired, TooManySubscribers, broadcaster, fetch_changes, format_event, latest_change_id
+from utils.pagination import paginate_keyset, parse_page_args
+from utils.search import search_news
+from utils.serialization import api_response, body_response, encode, negotiate_format
 from utils.validators import validate_user_data
+from utils.write_queue import WriteQueueBusy, news_writer
 
 api_bp = Blueprint('api_bp', __name__, url_prefix='/api')
 
 
+def _body_response(body, fmt, etag=None, last_modified=None):
+    response = body_response(body, fmt)
+    _set_validators(response, etag, last_modified)
+    return response
+
+
+def _set_validators(response, etag, last_modified):
+    if etag is not None:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    """
+    Проверяет условные заголовки запроса (If-None-Match / If-Modified-Since).
+    Возвращает ответ 304, если у клиента актуальная версия, иначе None.
+    """
+    if request.if_none_match:
+        # Слабое сравнение (RFC 9110): сжатый ответ несёт тот же ETag с пометкой W/
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    elif request.if_modified_since and last_modified is not None:
+        # HTTP-даты имеют точность до секунды
+        if last_modified.replace(tzinfo=timezone.utc, microsecond=0) > request.if_modified_since:
+            return None
+    else:
+        return None
+
+    response = current_app.response_class(status=304)
+    response.vary.add('Accept')
+    _set_validators(response, etag, last_modified)
+    return response
+
+
+# Поля новости для ?fields=...; excerpt - начало текста длиной NEWS_EXCERPT_LENGTH
+NEWS_FIELDS = ('id', 'title', 'content', 'excerpt', 'user_id', 'author')
+FULL_NEWS_FIELDS = ('id', 'title', 'content', 'user_id', 'author')
+SUMMARY_NEWS_FIELDS = ('id', 'title', 'excerpt', 'user_id', 'author')
+
+
+def _parse_news_fields():
+    """Разбирает ?fields=... и ?view=full|summary. Бросает ValueError при ошибке."""
+    view = request.args.get('view', 'full')
+    if view not in ('full', 'summary'):
+        raise ValueError('Параметр view должен быть full или summary')
+
+    fields = request.args.get('fields')
+    if fields is None:
+        return SUMMARY_NEWS_FIELDS if view == 'summary' else FULL_NEWS_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    if not fields or any(field not in NEWS_FIELDS for field in fields):
+        raise ValueError(f"Допустимые поля: {', '.join(NEWS_FIELDS)}")
+    return fields
+
+
+def _news_select(fields):
+    """
+    SELECT только запрошенных столбцов: content не читается, если он не нужен,
+    а для excerpt из базы берётся только начало текста. id выбирается всегда (курсор).
+    """
+    columns = [News.id]
+    if 'title' in fields:
+        columns.append(News.title)
+    if 'content' in fields:
+        columns.append(News.content)
+    if 'excerpt' in fields:
+        length = current_app.config['NEWS_EXCERPT_LENGTH']
+        columns.append(db.func.substr(News.content, 1, length + 1).label('excerpt'))
+    if 'user_id' in fields:
+        columns.append(News.user_id)
+    query = db.select(*columns)
+    if 'author' in fields:
+        query = query.add_columns(User.first_name, User.last_name).join(User, News.user_id == User.id)
+    return query
+
+
+def _news_row_to_dict(row, fields):
+    data = {}
+    for field in fields:
+        if field == 'author':
+            data['author'] = f'{row.first_name} {row.last_name}'
+        elif field == 'excerpt':
+            length = current_app.config['NEWS_EXCERPT_LENGTH']
+            data['excerpt'] = row.excerpt[:length] + '…' if len(row.excerpt) > length else row.excerpt
+        else:
+            data[field] = getattr(row, field)
+    return data
+
+
+def _news_table_version():
+    return table_version(db.session, 'news')
+
+
 # --- API для новостей ---
 @api_bp.route('/news', methods=['GET'])
 def get_news_api():
-    news_list = News.query.all()
-    return jsonify([news.to_dict(include_author=True) for news in news_list])
+    try:
+        limit, after, before = parse_page_args(request.args, current_app.config['NEWS_PER_PAGE'],
+                                               current_app.config['MAX_PER_PAGE'])
+        fields = _parse_news_fields()
+    except ValueError as e:
+        return api_response({'message': str(e)}), 400
+
+    # Валидаторы считаются по счётчику версий таблицы - без загрузки и сериализации строк
+    version, last_modified = _news_table_version()
+    fmt = negotiate_format()
+    etag = f"news-v{version}-{limit}-{after}-{before}-{'.'.join(fields)}-{fmt}"
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = ('news:list', version, limit, after, before, fields, fmt)
+    body = response_cache.get(cache_key)
+    if body is None:
+        # Имя автора берётся тем же запросом через JOIN, без SELECT на каждую новость
+        rows, next_cursor, prev_cursor = paginate_keyset(_news_select(fields), News.id, limit, after, before,
+                                                         rows=True)
+        body = encode({
+            'items': [_news_row_to_dict(row, fields) for row in rows],
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
+        }, fmt)
+        response_cache.set(cache_key, body, tags=('news:list',))
+    return _body_response(body, fmt, etag, last_modified)
+
+
+@api_bp.route('/news/search', methods=['GET'])
+def search_news_api():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return api_response({'message': 'Параметр q обязателен'}), 400
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['NEWS_PER_PAGE']))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return api_response({'message': 'Параметры limit и offset должны быть целыми числами'}), 400
+    if limit < 1 or limit > current_app.config['MAX_PER_PAGE'] or offset < 0:
+        return api_response({'message': f"Параметр limit должен быть от 1 до {current_app.config['MAX_PER_PAGE']}, "
+                                   f"offset - неотрицательным"}), 400
+
+    version, _ = _news_table_version()
+    fmt = negotiate_format()
+    cache_key = ('news:search', version, query, limit, offset, fmt)
+    body = response_cache.get(cache_key)
+    if body is None:
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        results = search_news(query, limit + 1, offset)
+        body = encode({
+            'items': results[:limit],
+            'next_offset': offset + limit if len(results) > limit else None
+        }, fmt)
+        response_cache.set(cache_key, body, tags=('news:list',))
+    return _body_response(body, fmt)
+
+
+@api_bp.route('/news/export', methods=['GET'])
+def export_news_api():
+    """
+    Потоковая выгрузка новостей в NDJSON или CSV.
+    Строки читаются пачками (yield_per) и сразу отдаются клиенту, поэтому память не зависит от размера таблицы.
+    Фильтры: user_id, after/before - диапазон id (для продолжения прерванной выгрузки).
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return api_response({'message': 'Поддерживаются форматы ndjson и csv'}), 400
+
+    try:
+        user_id = request.args.get('user_id')
+        after = request.args.get('after')
+        before = request.args.get('before')
+        user_id = int(user_id) if user_id is not None else None
+        after = int(after) if after is not None else None
+        before = int(before) if before is not None else None
+    except ValueError:
+        return api_response({'message': 'Параметры user_id, after и before должны быть целыми числами'}), 400
+
+    query = (
+        db.select(News.id, News.title, News.content, News.user_id, User.first_name, User.last_name)
+        .join(User, News.user_id == User.id)
+        .order_by(News.id)
+        .execution_options(yield_per=current_app.config['EXPORT_BATCH_SIZE'])
+    )
+    if user_id is not None:
+        query = query.where(News.user_id == user_id)
+    if after is not None:
+        query = query.where(News.id > after)
+    if before is not None:
+        query = query.where(News.id < before)
+
+    def generate():
+        result = db.session.execute(query)
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(['id', 'title', 'content', 'user_id', 'author'])
+            yield buffer.getvalue()
+        for rows in result.partitions():
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows((row.id, row.title, row.content, row.user_id,
+                                  f'{row.first_name} {row.last_name}') for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield ''.join(json.dumps({
+                    'id': row.id,
+                    'title': row.title,
+                    'content': row.content,
+                    'user_id': row.user_id,
+                    'author': f'{row.first_name} {row.last_name}'
+                }, ensure_ascii=False) + '\n' for row in rows)
+
+    if export_format == 'csv':
+        response = current_app.response_class(stream_with_context(generate()), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=news.csv'
+    else:
+        response = current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+    return response
+
+
+@api_bp.route('/news/changes', methods=['GET'])
+def news_changes_api():
+    """
+    Изменения новостей после курсора since (id записи журнала) - вместо опроса всего списка.
+    next_cursor передаётся в since следующего запроса; 410 - курсор устарел, нужна полная синхронизация.
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        limit = int(request.args.get('limit', current_app.config['MAX_PER_PAGE']))
+    except ValueError:
+        return api_response({'message': 'Параметры since и limit должны быть целыми числами'}), 400
+    if since < 0 or limit < 1 or limit > current_app.config['MAX_PER_PAGE']:
+        return api_response({'message': f"Параметр limit должен быть от 1 до {current_app.config['MAX_PER_PAGE']}, "
+                                   f"since - неотрицательным"}), 400
+
+    try:
+        changes = fetch_changes(since, limit + 1)
+    except ChangesExpired:
+        return api_response({'message': 'Журнал изменений после этого курсора уже очищен',
+                             'cursor': latest_change_id()}), 410
+    items = changes[:limit]
+    return api_response({
+        'items': items,
+        'next_cursor': items[-1]['id'] if items else since,
+        'has_more': len(changes) > limit
+    })
+
+
+@api_bp.route('/news/stream', methods=['GET'])
+def news_stream_api():
+    """
+    Поток изменений новостей (Server-Sent Events). При переподключении браузер передаёт
+    Last-Event-ID, и пропущенные события досылаются из журнала.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        last_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        return api_response({'message': 'Last-Event-ID должен быть целым числом'}), 400
+
+    # Подписываемся до чтения пропущенного, чтобы не потерять изменения между ними
+    try:
+        subscriber = broadcaster.subscribe()
+    except TooManySubscribers:
+        response = api_response({'message': 'Слишком много подписчиков, повторите подключение позже'})
+        response.headers['Retry-After'] = str(current_app.config['NEWS_STREAM_HEARTBEAT'])
+        return response, 503
+    backlog = []
+    if last_id is None:
+        last_id = latest_change_id()
+    else:
+        try:
+            changes = fetch_changes(last_id, current_app.config['NEWS_STREAM_BACKLOG'])
+        except ChangesExpired:
+            broadcaster.unsubscribe(subscriber)
+            return api_response({'message': 'Журнал изменений после этого курсора уже очищен',
+                                 'cursor': latest_change_id()}), 410
+        backlog = [format_event(change, current_app.json.dumps) for change in changes]
+        if changes:
+            last_id = changes[-1]['id']
+
+    if len(backlog) == current_app.config['NEWS_STREAM_BACKLOG']:
+        # Клиент отстал сильнее: отдаём порцию и закрываем поток, он переподключится со следующего id
+        broadcaster.unsubscribe(subscriber)
+        body = backlog
+    else:
+        # Генератор не использует контекст запроса и базу: соединение из пула возвращается сразу
+        body = broadcaster.stream(subscriber, backlog, last_id)
+    response = current_app.response_class(body, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx не должен буферизовать поток
+    return response
 
 
 @api_bp.route('/news/<int:news_id>', methods=['GET'])
 def get_single_news_api(news_id):
-    news = db.session.get(News, news_id)
-    if news is None:
-        return jsonify({'message': 'Новость не найдена'}), 404
-    return jsonify(news.to_dict(include_author=True))
+    try:
+        fields = _parse_news_fields()
+    except ValueError as e:
+        return api_response({'message': str(e)}), 400
+
+    # Лёгкий запрос без content: ревизия новости и имя автора (оно тоже входит в ответ)
+    meta = db.session.execute(
+        db.select(News.revision, News.updated_at, User.first_name, User.last_name)
+        .join(User, News.user_id == User.id)
+        .where(News.id == news_id)
+    ).one_or_none()
+    if meta is None:
+        return api_response({'message': 'Новость не найдена'}), 404
+
+    author_hash = hashlib.sha1(f'{meta.first_name} {meta.last_name}'.encode()).hexdigest()[:8]
+    fmt = negotiate_format()
+    etag = f"news-{news_id}-r{meta.revision}-{author_hash}-{'.'.join(fields)}-{fmt}"
+    not_modified = _not_modified(etag, meta.updated_at)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = ('news', news_id, meta.revision, author_hash, fields, fmt)
+    body = response_cache.get(cache_key)
+    if body is None:
+        row = db.session.execute(
+            _news_select(fields).add_columns(News.user_id.label('owner_id')).where(News.id == news_id)
+        ).one_or_none()
+        if row is None:
+            return api_response({'message': 'Новость не найдена'}), 404
+        body = encode(_news_row_to_dict(row, fields), fmt)
+        response_cache.set(cache_key, body, tags=(f'news:{news_id}', f'user:{row.owner_id}:news'))
+    return _body_response(body, fmt, etag, meta.updated_at)
 
 
 @api_bp.route('/news', methods=['POST'])
@@ -28,21 +357,35 @@ def get_single_news_api(news_id):
 def add_news_api():
     data = request.json
     if not data:
-        return jsonify({'message': 'Отсутствуют данные в формате JSON'}), 400
+        return api_response({'message': 'Отсутствуют данные в формате JSON'}), 400
 
     title = data.get('title')
     content = data.get('content')
 
     if not title or not content:
-        return jsonify({'message': 'Заголовок и содержание обязательны'}), 400
+        return api_response({'message': 'Заголовок и содержание обязательны'}), 400
 
     if len(title) > 100 or len(title) < 1:
-        return jsonify({'message': 'Заголовок должен быть от 1 до 100 символов'}), 400
+        return api_response({'message': 'Заголовок должен быть от 1 до 100 символов'}), 400
+
+    if news_writer.enabled:
+        # Пока ждём писателя, соединение запроса не должно держать транзакцию чтения:
+        # без WAL она не даёт писателю зафиксировать пачку
+        db.session.close()
+        try:
+            news_id = news_writer.add_news(title, content, current_user.id)
+        except WriteQueueBusy:
+            response = api_response({'message': 'Сервер перегружен, повторите запрос позже'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        mark_primary_write()
+        return api_response({'id': news_id, 'title': title, 'content': content, 'user_id': current_user.id}), 201
 
     news = News(title=title, content=content, user_id=current_user.id)
     db.session.add(news)
     db.session.commit()
-    return jsonify(news.to_dict()), 201
+    invalidate_news()
+    return api_response(news.to_dict()), 201
 
 
 @api_bp.route('/news/<int:news_id>', methods=['PUT'])
@@ -50,27 +393,28 @@ def add_news_api():
 def update_news_api(news_id):
     news = db.session.get(News, news_id)
     if news is None:
-        return jsonify({'message': 'Новость не найдена'}), 404
+        return api_response({'message': 'Новость не найдена'}), 404
 
     if news.user_id != current_user.id:
-        return jsonify({'message': 'Вы можете редактировать только свои новости'}), 403
+        return api_response({'message': 'Вы можете редактировать только свои новости'}), 403
 
     data = request.json
     if not data:
-        return jsonify({'message': 'Отсутствуют данные в формате JSON'}), 400
+        return api_response({'message': 'Отсутствуют данные в формате JSON'}), 400
 
     title = data.get('title')
     content = data.get('content')
 
     if title:
         if len(title) > 100 or len(title) < 1:
-            return jsonify({'message': 'Заголовок должен быть от 1 до 100 символов'}), 400
+            return api_response({'message': 'Заголовок должен быть от 1 до 100 символов'}), 400
         news.title = title
     if content:
         news.content = content
 
     db.session.commit()
-    return jsonify(news.to_dict())
+    invalidate_news(news_id)
+    return api_response(news.to_dict())
 
 
 @api_bp.route('/news/<int:news_id>', methods=['DELETE'])
@@ -78,14 +422,177 @@ def update_news_api(news_id):
 def delete_news_api(news_id):
     news = db.session.get(News, news_id)
     if news is None:
-        return jsonify({'message': 'Новость не найдена'}), 404
+        return api_response({'message': 'Новость не найдена'}), 404
 
     if news.user_id != current_user.id:
-        return jsonify({'message': 'Вы можете удалить только свои новости'}), 403
+        return api_response({'message': 'Вы можете удалить только свои новости'}), 403
 
     db.session.delete(news)
     db.session.commit()
-    return jsonify({'message': 'Новость успешно удалена'}), 204  # 204 No Content for successful deletion
+    invalidate_news(news_id)
+    return api_response({'message': 'Новость успешно удалена'}), 204  # 204 No Content for successful deletion
+
+
+# --- Пакетные операции над новостями ---
+# Весь пакет проверяется заранее и записывается одной транзакцией: либо все элементы, либо ни одного.
+
+
+def _batch_items(expected_type):
+    """Достаёт из тела запроса массив элементов. Возвращает (items, error_response)."""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return None, (api_response({'message': 'Ожидается непустой массив в формате JSON'}), 400)
+
+    max_size = current_app.config['NEWS_BATCH_MAX_SIZE']
+    if len(items) > max_size:
+        return None, (api_response({'message': f'Не более {max_size} элементов за запрос'}), 400)
+
+    if not all(isinstance(item, expected_type) for item in items):
+        return None, (api_response({'message': 'Некорректный формат элементов массива'}), 400)
+    return items, None
+
+
+def _check_ownership(ids):
+    """
+    Проверяет одним запросом, что все новости существуют и принадлежат текущему пользователю.
+    Возвращает (errors, status) - ошибки по индексам элементов.
+    """
+    owners = dict(db.session.execute(
+        db.select(News.id, News.user_id).where(News.id.in_(ids))
+    ).all())
+
+    errors = {}
+    status = None
+    for index, news_id in enumerate(ids):
+        if news_id not in owners:
+            errors[index] = 'Новость не найдена'
+            status = status or 404
+        elif owners[news_id] != current_user.id:
+            errors[index] = 'Можно изменять только свои новости'
+            status = 403
+    return errors, status
+
+
+def _batch_ids(items, key=None):
+    ids = [item.get(key) if key else item for item in items]
+    if not all(isinstance(news_id, int) and not isinstance(news_id, bool) for news_id in ids):
+        return None, (api_response({'message': 'Идентификаторы новостей должны быть целыми числами'}), 400)
+    if len(set(ids)) != len(ids):
+        return None, (api_response({'message': 'Идентификаторы новостей в пакете повторяются'}), 400)
+    return ids, None
+
+
+@api_bp.route('/news/batch', methods=['POST'])
+@login_required
+def add_news_batch_api():
+    items, error = _batch_items(dict)
+    if error:
+        return error
+
+    errors = {}
+    for index, item in enumerate(items):
+        title = item.get('title')
+        content = item.get('content')
+        if not title or not content:
+            errors[index] = 'Заголовок и содержание обязательны'
+        elif not isinstance(title, str) or not isinstance(content, str):
+            errors[index] = 'Заголовок и содержание должны быть строками'
+        elif len(title) > 100:
+            errors[index] = 'Заголовок должен быть от 1 до 100 символов'
+    if errors:
+        return api_response({'message': 'Ошибка валидации', 'errors': errors}), 400
+
+    rows = [{'title': item['title'], 'content': item['content'], 'user_id': current_user.id}
+            for item in items]
+    # Одна многострочная вставка; id возвращаются в порядке элементов запроса
+    ids = db.session.scalars(
+        db.insert(News).returning(News.id, sort_by_parameter_order=True), rows
+    ).all()
+    bump_table_version(db.session, 'news')
+    record_news_changes(db.session, 'create', ids)
+    adjust_news_count(db.session, {current_user.id: len(ids)})
+    db.session.commit()
+    invalidate_news()
+    return api_response({'results': [{'index': index, 'id': news_id, 'status': 201}
+                                for index, news_id in enumerate(ids)]}), 201
+
+
+@api_bp.route('/news/batch', methods=['PATCH'])
+@login_required
+def update_news_batch_api():
+    items, error = _batch_items(dict)
+    if error:
+        return error
+    ids, error = _batch_ids(items, 'id')
+    if error:
+        return error
+
+    errors = {}
+    for index, item in enumerate(items):
+        title = item.get('title')
+        content = item.get('content')
+        if not title and not content:
+            errors[index] = 'Нужно указать заголовок или содержание'
+        elif (title and not isinstance(title, str)) or (content and not isinstance(content, str)):
+            errors[index] = 'Заголовок и содержание должны быть строками'
+        elif title and len(title) > 100:
+            errors[index] = 'Заголовок должен быть от 1 до 100 символов'
+    if errors:
+        return api_response({'message': 'Ошибка валидации', 'errors': errors}), 400
+
+    errors, status = _check_ownership(ids)
+    if errors:
+        return api_response({'message': 'Пакет отклонён', 'errors': errors}), status
+
+    # Один UPDATE, выполняемый executemany; пустые поля оставляют прежнее значение
+    table = News.__table__
+    stmt = (
+        db.update(table)
+        .where(table.c.id == db.bindparam('b_id'))
+        .values(title=db.func.coalesce(db.bindparam('b_title'), table.c.title),
+                content=db.func.coalesce(db.bindparam('b_content'), table.c.content),
+                revision=table.c.revision + 1,
+                updated_at=db.bindparam('b_updated_at'))
+    )
+    now = utcnow()
+    db.session.execute(stmt, [{'b_id': item['id'],
+                               'b_title': item.get('title') or None,
+                               'b_content': item.get('content') or None,
+                               'b_updated_at': now} for item in items])
+    bump_table_version(db.session, 'news')
+    record_news_changes(db.session, 'update', ids)
+    db.session.commit()
+    for news_id in ids:
+        invalidate_news(news_id)
+    return api_response({'results': [{'index': index, 'id': news_id, 'status': 200}
+                                for index, news_id in enumerate(ids)]})
+
+
+@api_bp.route('/news/batch', methods=['DELETE'])
+@login_required
+def delete_news_batch_api():
+    items, error = _batch_items(int)
+    if error:
+        return error
+    ids, error = _batch_ids(items)
+    if error:
+        return error
+
+    errors, status = _check_ownership(ids)
+    if errors:
+        return api_response({'message': 'Пакет отклонён', 'errors': errors}), status
+
+    db.session.execute(
+        db.delete(News).where(News.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    bump_table_version(db.session, 'news')
+    record_news_changes(db.session, 'delete', ids)
+    adjust_news_count(db.session, {current_user.id: -len(ids)})
+    db.session.commit()
+    for news_id in ids:
+        invalidate_news(news_id)
+    return api_response({'results': [{'index': index, 'id': news_id, 'status': 204}
+                                for index, news_id in enumerate(ids)]})
 
 
 # --- API для пользователей ---
@@ -93,31 +600,75 @@ def delete_news_api(news_id):
 
 @api_bp.route('/users', methods=['GET'])
 def get_users_api():
-    users_list = User.query.all()
-    return jsonify([user.to_dict() for user in users_list])
+    try:
+        limit, after, before = parse_page_args(request.args, current_app.config['USERS_PER_PAGE'],
+                                               current_app.config['MAX_PER_PAGE'])
+    except ValueError as e:
+        return api_response({'message': str(e)}), 400
+
+    users_list, next_cursor, prev_cursor = paginate_keyset(db.select(User), User.id, limit, after, before)
+    return api_response({
+        'items': [user.to_dict() for user in users_list],
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor
+    })
 
 
 @api_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_single_user_api(user_id):
     user = db.session.get(User, user_id)
     if user is None:
-        return jsonify({'message': 'Пользователь не найден'}), 404
-    return jsonify(user.to_dict())
+        return api_response({'message': 'Пользователь не найден'}), 404
+    return api_response(user.to_dict())
+
+
+@api_bp.route('/users/<int:user_id>/news', methods=['GET'])
+def get_user_news_api(user_id):
+    """Новости одного автора постранично (индекс (user_id, id), без просмотра чужих новостей)."""
+    try:
+        limit, after, before = parse_page_args(request.args, current_app.config['NEWS_PER_PAGE'],
+                                               current_app.config['MAX_PER_PAGE'])
+        fields = _parse_news_fields()
+    except ValueError as e:
+        return api_response({'message': str(e)}), 400
+
+    if db.session.get(User, user_id) is None:
+        return api_response({'message': 'Пользователь не найден'}), 404
+
+    version, last_modified = _news_table_version()
+    fmt = negotiate_format()
+    etag = f"news-v{version}-u{user_id}-{limit}-{after}-{before}-{'.'.join(fields)}-{fmt}"
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = ('user:news', version, user_id, limit, after, before, fields, fmt)
+    body = response_cache.get(cache_key)
+    if body is None:
+        query = _news_select(fields).where(News.user_id == user_id)
+        rows, next_cursor, prev_cursor = paginate_keyset(query, News.id, limit, after, before, rows=True)
+        body = encode({
+            'items': [_news_row_to_dict(row, fields) for row in rows],
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
+        }, fmt)
+        response_cache.set(cache_key, body, tags=('news:list', f'user:{user_id}:news'))
+    return _body_response(body, fmt, etag, last_modified)
 
 
 @api_bp.route('/users', methods=['POST'])
 def register_user_api():
     data = request.json
     if not data:
-        return jsonify({'message': 'Отсутствуют данные в формате JSON'}), 400
+        return api_response({'message': 'Отсутствуют данные в формате JSON'}), 400
 
     errors = validate_user_data(data)
     if errors:
-        return jsonify({'message': 'Ошибка валидации', 'errors': errors}), 400
+        return api_response({'message': 'Ошибка валидации', 'errors': errors}), 400
 
     email = data.get('email')
     if User.query.filter_by(email=email).first():
-        return jsonify({'message': 'Этот email уже зарегистрирован'}), 400
+        return api_response({'message': 'Этот email уже зарегистрирован'}), 400
 
     user = User(first_name=data['first_name'],
                 last_name=data['last_name'],
@@ -125,7 +676,7 @@ def register_user_api():
     user.set_password(data['password'])
     db.session.add(user)
     db.session.commit()
-    return jsonify(user.to_dict()), 201
+    return api_response(user.to_dict()), 201
 
 
 @api_bp.route('/users/<int:user_id>', methods=['PUT'])
@@ -133,19 +684,19 @@ def register_user_api():
 def update_user_api(user_id):
     user = db.session.get(User, user_id)
     if user is None:
-        return jsonify({'message': 'Пользователь не найден'}), 404
+        return api_response({'message': 'Пользователь не найден'}), 404
 
     # Пользователь может редактировать только свой профиль, если он не администратор
     if user.id != current_user.id:
-        return jsonify({'message': 'Вы можете редактировать только свой профиль'}), 403
+        return api_response({'message': 'Вы можете редактировать только свой профиль'}), 403
 
     data = request.json
     if not data:
-        return jsonify({'message': 'Отсутствуют данные в формате JSON'}), 400
+        return api_response({'message': 'Отсутствуют данные в формате JSON'}), 400
 
     errors = validate_user_data(data, is_update=True)
     if errors:
-        return jsonify({'message': 'Ошибка валидации', 'errors': errors}), 400
+        return api_response({'message': 'Ошибка валидации', 'errors': errors}), 400
 
     if 'first_name' in data:
         user.first_name = data['first_name']
@@ -154,13 +705,16 @@ def update_user_api(user_id):
     if 'email' in data:
         # Проверяем, не занят ли новый email другим пользователем
         if User.query.filter(User.email == data['email'], User.id != user.id).first():
-            return jsonify({'message': 'Этот email уже зарегистрирован другим пользователем'}), 400
+            return api_response({'message': 'Этот email уже зарегистрирован другим пользователем'}), 400
         user.email = data['email']
     if 'password' in data:
         user.set_password(data['password'])
 
     db.session.commit()
-    return jsonify(user.to_dict())
+    invalidate_user(user.id)
+    # Имя автора входит в закешированные ответы с его новостями
+    invalidate_news(user_id=user.id)
+    return api_response(user.to_dict())
 
 
 @api_bp.route('/users/<int:user_id>', methods=['DELETE'])
@@ -168,14 +722,16 @@ def update_user_api(user_id):
 def delete_user_api(user_id):
     user = db.session.get(User, user_id)
     if user is None:
-        return jsonify({'message': 'Пользователь не найден'}), 404
+        return api_response({'message': 'Пользователь не найден'}), 404
 
     # Пользователь может удалить только свой профиль, если он не администратор
     if user.id != current_user.id:
-        return jsonify({'message': 'Вы можете удалить только свой профиль'}), 403
+        return api_response({'message': 'Вы можете удалить только свой профиль'}), 403
 
-    # При удалении пользователя, связанные новости будут удалены благодаря cascade='all, delete-orphan'
+    # Новости пользователя удаляются в той же транзакции внешним ключом ON DELETE CASCADE
     db.session.delete(user)
     db.session.commit()
+    invalidate_user(user_id)
+    invalidate_news(user_id=user_id)
     logout_user()  # Выход из системы после удаления своего аккаунта
-    return jsonify({'message': 'Пользователь успешно удален'}), 204
\ No newline at end of file
+    return api_response({'message': 'Пользователь успешно удален'}), 204
\ No newline at end of file
@@ -1,155 +1,50 @@
 # app.py
-from flask import Flask, jsonify, render_template, redirect, url_for, flash, request
-from flask_login import LoginManager, current_user, login_user, logout_user, login_required
-from db_instance import db
-from models import User, News
-from forms import LoginForm, RegistrationForm, NewsForm
-from api_bp import api_bp
-
-# Инициализация Flask приложения
-app = Flask(__name__)
-
-# Загрузка конфигурации
-app.config.from_object('config.Config')
-
-# Инициализация SQLAlchemy
-db.init_app(app)
+import click
+from flask import Flask, current_app, flash, redirect, request, url_for
+from flask.cli import with_appcontext
+from flask_login import LoginManager
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import get_config
+from db_instance import REPLICA_BIND, configure_engines, db, dispose_engines, report_engine_settings, sync_replica
+from models import User, UserIdentity
+from utils.cache import cache_collector, fragment_cache, response_cache, user_cache
+from utils.changefeed import broadcaster, changefeed_collector
+from utils.compression import compressor
+from utils.fragments import init_template_caches
+from utils.hashing import password_hasher
+from utils.limits import admission, admission_collector
+from utils.metrics import metrics
+from utils.serialization import FastJSONProvider
+from utils.write_queue import news_writer
 
 # Инициализация Flask-Login
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'main.login'
+
 
 @login_manager.user_loader
 def load_user(user_id):
     """
     Для загрузки пользователя по его ID из сессии.
+    Для безопасных методов берём пользователя из кеша; изменяющие запросы всегда
+    проверяют по БД, что пользователь ещё существует (кеш другого процесса может отставать на TTL).
     """
-    return db.session.get(User, int(user_id))
-
-with app.app_context():
-    db.create_all()
-
-# Регистрация Blueprint API
-app.register_blueprint(api_bp)
-
-# --- Фронтенд маршруты ---
-
-@app.route('/')
-@app.route('/index')
-def index():
-    # Получаем все новости для отображения на главной странице
-    news_list = News.query.all()
-    return render_template('index.html', title='Главная', news=news_list)
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if current_user.is_authenticated:
-        return redirect(url_for('index'))
-    form = LoginForm()
-    if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data).first()
-        if user is None or not user.check_password(form.password.data):
-            flash('Неправильный email или пароль')
-            return redirect(url_for('login'))
-        login_user(user, remember=form.remember_me.data)
-        flash('Вы успешно вошли в систему!')
-        return redirect(url_for('index'))
-    return render_template('login.html', title='Вход', form=form)
-
-@app.route('/logout')
-def logout():
-    logout_user()
-    flash('Вы вышли из системы.')
-    return redirect(url_for('index'))
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if current_user.is_authenticated:
-        return redirect(url_for('index'))
-    form = RegistrationForm()
-    if form.validate_on_submit():
-        user = User(first_name=form.first_name.data,
-                    last_name=form.last_name.data,
-                    email=form.email.data)
-        user.set_password(form.password.data)
-        db.session.add(user)
-        db.session.commit()
-        flash('Поздравляем, вы успешно зарегистрированы!')
-        return redirect(url_for('login'))
-    return render_template('register.html', title='Регистрация', form=form)
-
-@app.route('/add_news', methods=['GET', 'POST'])
-@login_required
-def add_news():
-    form = NewsForm()
-    if form.validate_on_submit():
-        news = News(title=form.title.data, content=form.content.data, user_id=current_user.id)
-        db.session.add(news)
-        db.session.commit()
-        flash('Ваша новость успешно добавлена!')
-        return redirect(url_for('index'))
-    return render_template('add_news.html', title='Добавить новость', form=form)
-
-@app.route('/edit_news/<int:news_id>', methods=['GET', 'POST'])
-@login_required
-def edit_news(news_id):
-    news = db.session.get(News, news_id)
-    if news is None:
-        flash('Новость не найдена.')
-        return redirect(url_for('index'))
-
-    if news.user_id != current_user.id:
-        flash('Вы можете редактировать только свои новости.')
-        return redirect(url_for('index'))
-
-    form = NewsForm()
-    if form.validate_on_submit():
-        news.title = form.title.data
-        news.content = form.content.data
-        db.session.commit()
-        flash('Ваша новость успешно обновлена!')
-        return redirect(url_for('index'))
-    elif request.method == 'GET':
-        form.title.data = news.title
-        form.content.data = news.content
-    return render_template('edit_news.html', title='Редактировать новость', form=form)
-
-@app.route('/delete_news/<int:news_id>', methods=['POST'])
-@login_required
-def delete_news(news_id):
-    news = db.session.get(News, news_id)
-    if news is None:
-        flash('Новость не найдена.')
-        return redirect(url_for('index'))
-
-    if news.user_id != current_user.id:
-        flash('Вы можете удалить только свои новости.')
-        return redirect(url_for('index'))
-
-    db.session.delete(news)
-    db.session.commit()
-    flash('Новость успешно удалена!')
-    return redirect(url_for('index'))
-
-
-# --- Обработчики ошибок Flask ---
-@app.errorhandler(404)
-def not_found_error(error):
-    return render_template('404.html'), 404
-
-@app.errorhandler(400)
-def bad_request_error(error):
-    return jsonify({'error': 'Bad request', 'details': str(error)}), 400
-
-@app.errorhandler(403)
-def forbidden_error(error):
-    return jsonify({'error': 'Forbidden'}), 403
-
-@app.errorhandler(500)
-def internal_error(error):
-    db.session.rollback()
-    return render_template('500.html'), 500
+    user_id = int(user_id)
+    use_cache = request.method in ('GET', 'HEAD', 'OPTIONS')
+    if use_cache:
+        identity = user_cache.get(user_id)
+        if identity is not None:
+            return identity
+
+    # Всегда основная БД: только что зарегистрированного пользователя в реплике может ещё не быть
+    user = db.session.get(User, user_id, bind_arguments={'bind': db.engine})
+    if user is None:
+        return None
+    identity = UserIdentity.from_user(user)
+    if use_cache:
+        user_cache.set(user_id, identity)
+    return identity
+
 
 # Обработчик, когда пользователь не авторизован
 #@login_manager.unauthorized_handler
@@ -159,8 +54,169 @@ def internal_error(error):
 @login_manager.unauthorized_handler
 def unauthorized():
     flash('Для доступа к этой странице необходимо войти в систему.')
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
+
+
+def create_app(config=None):
+    """
+    Создаёт и настраивает приложение.
+    config - класс конфигурации или имя профиля; по умолчанию профиль из переменной окружения APP_CONFIG.
+    Схема БД создаётся здесь только при AUTO_CREATE_SCHEMA, иначе - командой flask init-db.
+    """
+    if config is None or isinstance(config, str):
+        config = get_config(config)
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+
+    # За обратным прокси адрес клиента, схема и хост берутся из заголовков X-Forwarded-*
+    proxies = app.config['TRUSTED_PROXY_COUNT']
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
+    # Быстрый JSON (orjson, если установлен) для jsonify и API
+    app.json = FastJSONProvider(app)
+
+    # Инициализация SQLAlchemy
+    db.init_app(app)
+    configure_engines(app)
+
+    # Пул для хеширования паролей
+    password_hasher.init_app(app)
+
+    # Настройка кеша ответов
+    response_cache.configure(maxsize=app.config['RESPONSE_CACHE_SIZE'],
+                             ttl=app.config['RESPONSE_CACHE_TTL'],
+                             enabled=app.config['RESPONSE_CACHE_ENABLED'])
+    user_cache.configure(maxsize=app.config['USER_CACHE_SIZE'],
+                         ttl=app.config['USER_CACHE_TTL'],
+                         enabled=app.config['USER_CACHE_ENABLED'])
+    init_template_caches(app)
+
+    # Метрики запросов и SQL, /metrics
+    metrics.init_app(app)
+    metrics.register_collector(app, cache_collector(response_cache, user_cache, fragment_cache))
+    metrics.register_collector(app, changefeed_collector())
+    metrics.register_collector(app, admission_collector())
+
+    # Ограничение нагрузки: лимиты одновременных запросов и частоты по классам маршрутов
+    admission.init_app(app)
+
+    # Рассылка журнала изменений новостей подписчикам /api/news/stream
+    broadcaster.init_app(app)
+
+    # Групповая фиксация новых новостей (NEWS_GROUP_COMMIT_ENABLED)
+    news_writer.init_app(app)
+
+    # Сжатие ответов. Регистрируется после метрик: обработчики after_request вызываются
+    # в обратном порядке, поэтому метрики видят уже сжатый размер
+    compressor.init_app(app)
+
+    login_manager.init_app(app)
+
+    if app.config['AUTO_CREATE_SCHEMA']:
+        init_schema(app)
+    report_engine_settings(app)
+
+    # Маршруты импортируются здесь, а не при импорте модуля: их модули тянут формы,
+    # валидаторы и прочие зависимости, не нужные командам CLI и мастер-процессу сервера
+    from api_bp import api_bp
+    from views import main_bp
+    app.register_blueprint(main_bp)
+    app.register_blueprint(api_bp)
+
+    for command in (init_db_command, rebuild_search_index_command, prune_news_changes_command, seed_command,
+                    replica_sync_command):
+        app.cli.add_command(command)
+    return app
+
+
+def init_schema(app):
+    """Создаёт недостающие таблицы и доводит существующие до текущей схемы."""
+    from utils.schema import upgrade_schema
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        replica = db.engines.get(REPLICA_BIND)
+    if replica is not None and replica.dialect.name == 'sqlite':
+        sync_replica(app)  # реплика-копия SQLite получает ту же схему
+
+
+def reset_after_fork(app):
+    """
+    Вызывается в дочернем процессе сервера после fork (см. gunicorn.conf.py).
+    Соединения пула и пул хеширования, созданные в мастер-процессе, нельзя делить
+    между процессами - каждый рабочий процесс открывает свои.
+    """
+    dispose_engines(app)
+    password_hasher.init_app(app)
+
+
+# --- Команды CLI (flask --app app <команда>) ---
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Создаёт и обновляет схему БД (перед первым запуском production-сервера)."""
+    init_schema(current_app)
+    print('Схема БД создана.')
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Перестраивает полнотекстовый индекс новостей (flask --app app rebuild-search-index)."""
+    from utils.search import rebuild_search_index
+    rebuild_search_index()
+    print('Поисковый индекс перестроен.')
+
+
+@click.command('prune-news-changes')
+@with_appcontext
+def prune_news_changes_command():
+    """Удаляет старые записи журнала изменений новостей (flask --app app prune-news-changes)."""
+    from utils.changefeed import prune_changes
+    deleted = prune_changes(current_app.config['NEWS_CHANGES_RETENTION_DAYS'])
+    print(f'Удалено записей журнала: {deleted}')
+
+
+@click.command('seed')
+@click.option('--users', default=1000, show_default=True, help='Сколько пользователей создать.')
+@click.option('--news', default=100000, show_default=True, help='Сколько новостей создать.')
+@click.option('--seed', 'random_seed', default=0, show_default=True, help='Зерно генератора случайных чисел.')
+@click.option('--batch-size', default=10000, show_default=True, help='Строк в одном INSERT.')
+@click.option('--password', default='password', show_default=True, help='Пароль всех созданных пользователей.')
+@with_appcontext
+def seed_command(users, news, random_seed, batch_size, password):
+    """Заполняет базу синтетическими данными для замеров (flask --app app seed --users 10000 --news 1000000)."""
+    from utils.seed import seed_database
+    try:
+        seed_database(users, news, seed=random_seed, batch_size=batch_size, password=password)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+@click.command('replica-sync')
+@click.option('--interval', type=float, default=None,
+              help='Повторять копирование каждые N секунд (имитация асинхронной репликации).')
+@with_appcontext
+def replica_sync_command(interval):
+    """Копирует основную БД SQLite в файл реплики (flask --app app replica-sync)."""
+    import time
+    if REPLICA_BIND not in current_app.config['SQLALCHEMY_BINDS']:
+        raise click.ClickException('Реплика не настроена (REPLICA_DATABASE_URL)')
+    while True:
+        try:
+            elapsed = sync_replica(current_app)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        print(f'Реплика обновлена за {elapsed:.2f} с')
+        if interval is None:
+            return
+        time.sleep(interval)
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Сервер разработки; в production - gunicorn -c gunicorn.conf.py wsgi:app
+    create_app().run(debug=True)
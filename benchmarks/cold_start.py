@@ -0,0 +1,124 @@
+# benchmarks/cold_start.py
+"""
+Время холодного старта рабочего процесса: от запуска до первого ответа.
+
+  fresh  - новый интерпретатор: импорт app, create_app(), первый запрос
+           (так стартует каждый процесс без preload или после перезапуска)
+  forked - приложение создано заранее в родительском процессе, рабочий процесс получает его
+           через fork (preload_app в gunicorn.conf.py): reset_after_fork() и первый запрос
+
+Пример: python benchmarks/cold_start.py --runs 5 --config production
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+started = time.perf_counter()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PATHS = ('/api/news', '/index')
+
+
+def first_requests(app):
+    client = app.test_client()
+    timings = {}
+    for path in PATHS:
+        t0 = time.perf_counter()
+        status = client.get(path).status_code
+        timings[path] = (time.perf_counter() - t0) * 1000
+        assert status == 200, (path, status)
+    return timings
+
+
+def child_fresh(config):
+    t0 = time.perf_counter()
+    from app import create_app
+    t1 = time.perf_counter()
+    app = create_app(config)
+    t2 = time.perf_counter()
+    timings = first_requests(app)
+    return {
+        'import_ms': (t1 - t0) * 1000,
+        'create_app_ms': (t2 - t1) * 1000,
+        'first_requests_ms': timings,
+        'total_ms': (time.perf_counter() - started) * 1000,
+    }
+
+
+def child_forked(config):
+    from app import create_app, reset_after_fork
+    app = create_app(config)
+    read_fd, write_fd = os.pipe()
+    t0 = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        reset_after_fork(app)
+        timings = first_requests(app)
+        result = {'first_requests_ms': timings, 'total_ms': (time.perf_counter() - t0) * 1000}
+        os.write(write_fd, json.dumps(result).encode())
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        result = json.loads(pipe.read())
+    os.waitpid(pid, 0)
+    return result
+
+
+def run_child(mode, config, env):
+    t0 = time.perf_counter()
+    output = subprocess.run([sys.executable, __file__, '--child', mode, '--config', config],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if mode == 'fresh':
+        # Включая запуск интерпретатора
+        result['wall_ms'] = (time.perf_counter() - t0) * 1000
+    return result
+
+
+def summarize(results):
+    summary = {}
+    for key in results[0]:
+        if isinstance(results[0][key], dict):
+            summary[key] = {path: round(statistics.median(r[key][path] for r in results), 1)
+                            for path in results[0][key]}
+        else:
+            summary[key] = round(statistics.median(r[key] for r in results), 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--child', choices=('fresh', 'forked'))
+    args = parser.parse_args()
+
+    if args.child:
+        func = child_fresh if args.child == 'fresh' else child_forked
+        print(json.dumps(func(args.config)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix='news-bench-')
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'), LOG_LEVEL='WARNING')
+    # Схема готовится заранее, как командой flask init-db перед запуском сервера
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+
+    results = {'config': args.config}
+    modes = ('fresh', 'forked') if hasattr(os, 'fork') else ('fresh',)
+    for mode in modes:
+        run_child(mode, args.config, env)  # прогрев кеша байткода Python и Jinja
+        results[mode] = summarize([run_child(mode, args.config, env) for _ in range(args.runs)])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/compression_bench.py
+"""
+Экономия трафика и стоимость сжатия на типичных ответах: страница /api/news,
+одна новость и главная страница (русский текст).
+
+Для каждого ответа и уровня сжатия: размер до/после, доля экономии и время сжатия на запрос.
+
+Пример: python benchmarks/compression_bench.py --news 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='news-bench-'), 'bench.db'))
+
+from app import create_app  # noqa: E402
+from db_instance import db  # noqa: E402
+from models import News, User  # noqa: E402
+from utils.compression import brotli  # noqa: E402
+
+app = create_app()
+
+WORDS = ('сегодня', 'в', 'москве', 'прошло', 'заседание', 'городской', 'думы', 'на', 'котором',
+         'обсуждались', 'вопросы', 'благоустройства', 'парков', 'ремонта', 'дорог', 'школ')
+
+
+def seed(count):
+    rng = random.Random(1)
+    with app.app_context():
+        user = User(first_name='Иван', last_name='Иванов', email='bench@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        db.session.execute(db.insert(News), [
+            {'title': ' '.join(rng.choices(WORDS, k=6)).capitalize(),
+             'content': ' '.join(rng.choices(WORDS, k=rng.randint(100, 600))).capitalize() + '.',
+             'user_id': user.id}
+            for _ in range(count)
+        ])
+        db.session.commit()
+
+
+def timed(func, data, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        result = func(data)
+    return (time.perf_counter() - started) / number * 1000, len(result)
+
+
+def gzip_compress(level):
+    def compress(data):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    return compress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--number', type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.news)
+    client = app.test_client()
+    # Без Accept-Encoding ответ приходит несжатым - это исходные данные для сравнения
+    payloads = {
+        'news_list_20': client.get('/api/news?limit=20').data,
+        'news_list_100': client.get('/api/news?limit=100').data,
+        'news_single': client.get('/api/news/1').data,
+        'index_html': client.get('/index').data,
+    }
+
+    codecs = {f'gzip_{level}': gzip_compress(level) for level in (1, 6, 9)}
+    if brotli is not None:
+        for quality in (4, 11):
+            codecs[f'brotli_{quality}'] = lambda data, q=quality: brotli.compress(data, quality=q)
+
+    results = {}
+    for name, data in payloads.items():
+        row = {'original_bytes': len(data)}
+        for codec_name, codec in codecs.items():
+            ms, size = timed(codec, data, args.number)
+            row[codec_name] = {'bytes': size, 'saved': round(1 - size / len(data), 3), 'cpu_ms': round(ms, 3)}
+        results[name] = row
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+# benchmarks/load_test.py
+"""
+Нагрузочный тест API и HTML-страниц.
+
+Режимы:
+  inprocess - приложение запускается в этом же процессе (Flask test client) на временной базе;
+              дополнительно считается число SQL-запросов на запрос.
+  http      - запросы к уже запущенному серверу (--base-url), база заполняется через API.
+
+Пример:
+  python benchmarks/load_test.py --mode inprocess --users 20 --news 2000 --concurrency 8 \
+      --requests 5000 --write-ratio 0.1 --output bench.json
+
+Результат - JSON с p50/p95/p99, пропускной способностью и SQL на запрос по каждой операции,
+чтобы сравнивать прогоны между коммитами.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'benchmark-password'
+WORDS = ('новость', 'город', 'москва', 'погода', 'спорт', 'экономика', 'выборы', 'культура',
+         'фестиваль', 'дорога', 'школа', 'здоровье', 'наука', 'технологии', 'рынок', 'праздник')
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+
+def random_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+# --- Транспорты ---
+
+class InProcessTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json_body=None, form=None):
+        response = self.client.open(path, method=method, json=json_body, data=form)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        from client import NewsClient
+        # Без повторов: замер должен видеть ответы 429/503 как есть. Переходы по редиректам httpx не делает
+        self.client = NewsClient(base_url, retries=0)
+
+    def request(self, method, path, json_body=None, form=None):
+        response = self.client.http.request(method, path, json=json_body, data=form)
+        return response.status_code, response.text
+
+
+def login(transport, email):
+    """Вход через HTML-форму: API не имеет отдельного маршрута входа."""
+    _, html = transport.request('GET', '/login')
+    match = CSRF_RE.search(html)
+    form = {'email': email, 'password': PASSWORD}
+    if match:
+        form['csrf_token'] = match.group(1)
+    status, _ = transport.request('POST', '/login', form=form)
+    if status not in (200, 302):
+        raise RuntimeError(f'Не удалось войти как {email}: {status}')
+
+
+# --- Подготовка данных ---
+
+def seed_inprocess(app, users, news, rng):
+    from db_instance import db
+    from models import News, User, bump_table_version, recount_news
+    from utils.hashing import password_hasher
+
+    with app.app_context():
+        password_hash = password_hasher.hash(PASSWORD)  # один хеш на всех - хеширование не меряем
+        db.session.execute(db.insert(User), [
+            {'first_name': f'Пользователь{i}', 'last_name': 'Тестовый',
+             'email': f'bench{i}@example.com', 'password': password_hash}
+            for i in range(users)
+        ])
+        user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+        for start in range(0, news, 1000):
+            db.session.execute(db.insert(News), [
+                {'title': random_text(rng, 5)[:100], 'content': random_text(rng, rng.randint(30, 300)),
+                 'user_id': rng.choice(user_ids)}
+                for _ in range(start, min(news, start + 1000))
+            ])
+        recount_news(db.session)
+        bump_table_version(db.session, 'news')
+        db.session.commit()
+        news_ids = db.session.scalars(db.select(News.id)).all()
+    return [f'bench{i}@example.com' for i in range(users)], news_ids
+
+
+def seed_http(base_url, users, news, rng):
+    emails = []
+    news_ids = []
+    per_user = max(1, news // max(1, users))
+    run_id = int(time.time())
+    for i in range(users):
+        transport = HttpTransport(base_url)
+        email = f'bench{run_id}-{i}@example.com'
+        status, _ = transport.request('POST', '/api/users', json_body={
+            'first_name': f'Пользователь{i}', 'last_name': 'Тестовый', 'email': email, 'password': PASSWORD})
+        if status != 201:
+            raise RuntimeError(f'Не удалось зарегистрировать {email}: {status}')
+        login(transport, email)
+        for start in range(0, per_user, 500):
+            items = [{'title': random_text(rng, 5)[:100], 'content': random_text(rng, rng.randint(30, 300))}
+                     for _ in range(min(500, per_user - start))]
+            status, body = transport.request('POST', '/api/news/batch', json_body=items)
+            if status != 201:
+                raise RuntimeError(f'Не удалось создать новости: {status} {body[:200]}')
+            news_ids.extend(item['id'] for item in json.loads(body)['results'])
+        emails.append(email)
+    return emails, news_ids
+
+
+# --- Операции ---
+
+def op_list_news(ctx, rng):
+    cursor = rng.choice(ctx['news_ids']) if ctx['news_ids'] and rng.random() < 0.5 else None
+    path = '/api/news?limit=20' + (f'&after={cursor}' if cursor else '')
+    return ctx['transport'].request('GET', path)
+
+
+def op_get_news(ctx, rng):
+    return ctx['transport'].request('GET', f"/api/news/{rng.choice(ctx['news_ids'])}")
+
+
+def op_index(ctx, rng):
+    return ctx['transport'].request('GET', '/index')
+
+
+def op_list_users(ctx, rng):
+    return ctx['transport'].request('GET', '/api/users')
+
+
+def op_search(ctx, rng):
+    return ctx['transport'].request('GET', f'/api/news/search?q={rng.choice(WORDS)}')
+
+
+def op_create_news(ctx, rng):
+    status, body = ctx['transport'].request('POST', '/api/news', json_body={
+        'title': random_text(rng, 4)[:100], 'content': random_text(rng, 80)})
+    if status == 201:
+        ctx['own_news'].append(json.loads(body)['id'])
+    return status, body
+
+
+def op_update_news(ctx, rng):
+    if not ctx['own_news']:
+        return op_create_news(ctx, rng)
+    return ctx['transport'].request('PUT', f"/api/news/{rng.choice(ctx['own_news'])}",
+                                    json_body={'content': random_text(rng, 80)})
+
+
+def op_delete_news(ctx, rng):
+    if not ctx['own_news']:
+        return op_create_news(ctx, rng)
+    return ctx['transport'].request('DELETE', f"/api/news/{ctx['own_news'].pop()}")
+
+
+READ_OPS = [(op_list_news, 40), (op_get_news, 30), (op_index, 15), (op_search, 10), (op_list_users, 5)]
+WRITE_OPS = [(op_create_news, 60), (op_update_news, 30), (op_delete_news, 10)]
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    report = {}
+    for name, items in sorted(samples.items()):
+        latencies = [item[0] * 1000 for item in items]
+        statements = [item[2] for item in items if item[2] is not None]
+        report[name] = {
+            'count': len(items),
+            'errors': sum(1 for item in items if item[1] >= 400),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'mean_ms': statistics.fmean(latencies),
+            'throughput_rps': len(items) / elapsed,
+            'sql_per_request': statistics.fmean(statements) if statements else None,
+        }
+    return report
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--config', default='production', help='профиль APP_CONFIG для режима inprocess')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--news', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000, help='общее число запросов')
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='файл для JSON-отчёта (по умолчанию stdout)')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    statement_counter = threading.local()
+
+    if args.mode == 'inprocess':
+        workdir = tempfile.mkdtemp(prefix='news-bench-')
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+        os.environ['APP_CONFIG'] = args.config
+        # Все виртуальные пользователи приходят с одного адреса - лимиты частоты замер бы исказили
+        os.environ.setdefault('ADMISSION_CONTROL', '0')
+        from sqlalchemy import event
+        from app import create_app, init_schema
+        from db_instance import db
+
+        app = create_app()
+        init_schema(app)  # профиль production сам схему не создаёт
+        app.config['WTF_CSRF_ENABLED'] = False
+        with app.app_context():
+            for engine in db.engines.values():
+                @event.listens_for(engine, 'before_cursor_execute')
+                def count_statement(*_):
+                    statement_counter.value = getattr(statement_counter, 'value', 0) + 1
+
+        emails, news_ids = seed_inprocess(app, args.users, args.news, rng)
+
+        def make_transport():
+            return InProcessTransport(app)
+    else:
+        emails, news_ids = seed_http(args.base_url, args.users, args.news, rng)
+
+        def make_transport():
+            return HttpTransport(args.base_url)
+
+    samples = {}
+    samples_lock = threading.Lock()
+    per_worker = args.requests // args.concurrency
+
+    def worker(worker_id):
+        worker_rng = random.Random(args.seed * 1000 + worker_id)
+        ctx = {'transport': make_transport(), 'news_ids': news_ids, 'own_news': []}
+        login(ctx['transport'], emails[worker_id % len(emails)])
+        local = {}
+        for _ in range(per_worker):
+            ops = WRITE_OPS if worker_rng.random() < args.write_ratio else READ_OPS
+            op = worker_rng.choices([item[0] for item in ops], weights=[item[1] for item in ops])[0]
+            statement_counter.value = 0
+            started = time.perf_counter()
+            status, _ = op(ctx, worker_rng)
+            duration = time.perf_counter() - started
+            statements = statement_counter.value if args.mode == 'inprocess' else None
+            local.setdefault(op.__name__[3:], []).append((duration, status, statements))
+        with samples_lock:
+            for name, items in local.items():
+                samples.setdefault(name, []).extend(items)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(items) for items in samples.values())
+    result = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'params': vars(args),
+        'elapsed_s': elapsed,
+        'total_requests': total,
+        'throughput_rps': total / elapsed,
+        'operations': summarize(samples, elapsed),
+    }
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
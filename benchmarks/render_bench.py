@@ -0,0 +1,113 @@
+# benchmarks/render_bench.py
+"""
+Время отрисовки главной страницы на 1k и 10k новостей.
+
+  baseline     - исходный шаблон: все новости рендерятся целиком в одном цикле
+  cold         - кеш фрагментов пуст (каждый фрагмент рендерится и кладётся в кеш)
+  warm         - все фрагменты в кеше, рендерятся только элементы управления посетителя
+  compile_cold / compile_cached - загрузка шаблонов в новом окружении без кеша байткода и с ним
+
+Пример: python benchmarks/render_bench.py --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('APP_CONFIG', 'testing')
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader  # noqa: E402
+from flask import render_template  # noqa: E402
+from flask_login import current_user  # noqa: E402
+from app import create_app  # noqa: E402
+from models import News, User  # noqa: E402
+from utils.cache import fragment_cache  # noqa: E402
+from utils.fragments import render_news_fragments  # noqa: E402
+
+app = create_app()
+
+# Страница с циклом из index.html до выделения фрагментов - точка отсчёта
+BASELINE_TEMPLATE = """{% extends "base.html" %}{% block content %}
+{% for news_item in news %}
+<div class="list-group-item list-group-item-action mb-2">
+  <h5 class="mb-1">{{ news_item.title }}</h5>
+  <p class="mb-1">{{ news_item.content }}</p>
+  {% if news_item.author %}
+    <small>Автор: {{ news_item.author.first_name }} {{ news_item.author.last_name }}</small>
+  {% else %}
+    <small>Автор: Неизвестен</small>
+  {% endif %}
+  {% if current_user.is_authenticated and news_item.user_id == current_user.id %}
+    <br><a href="{{ url_for('main.edit_news', news_id=news_item.id) }}">Изменить</a>
+  {% endif %}
+</div>
+{% endfor %}
+{% endblock %}"""
+
+
+def make_news(count):
+    authors = [User(id=i, first_name=f'Автор{i}', last_name='Тестов', email=f'a{i}@e.com') for i in range(1, 51)]
+    text = 'Длинный текст новости на русском языке. ' * 20
+    return [News(id=i, title=f'Заголовок новости {i}', content=text, revision=1,
+                 user_id=authors[i % 50].id, author=authors[i % 50])
+            for i in range(1, count + 1)]
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    with app.test_request_context('/'):
+        baseline = app.jinja_env.from_string(BASELINE_TEMPLATE)
+        for size in args.sizes:
+            news = make_news(size)
+            fragment_cache.configure(maxsize=size * 2)
+
+            def render_cold():
+                fragment_cache.clear()
+                render_template('index.html', news=news, fragments=render_news_fragments(app.jinja_env, news))
+
+            def render_warm():
+                render_template('index.html', news=news, fragments=render_news_fragments(app.jinja_env, news))
+
+            results[size] = {
+                'baseline_ms': measure(lambda: baseline.render(news=news, current_user=current_user), args.repeat),
+                'cold_ms': measure(render_cold, args.repeat),
+                'warm_ms': measure(render_warm, args.repeat),
+            }
+
+    # Компиляция шаблонов в "новом процессе": свежее окружение без кеша и с кешем байткода
+    templates_dir = os.path.join(ROOT, 'templates')
+    cache_dir = tempfile.mkdtemp(prefix='jinja-bench-')
+
+    def load_templates(bytecode_cache):
+        env = Environment(loader=FileSystemLoader(templates_dir), bytecode_cache=bytecode_cache)
+        for name in ('base.html', 'index.html', '_news_item.html'):
+            env.get_template(name)
+
+    load_templates(FileSystemBytecodeCache(cache_dir))  # заполняем кеш
+    results['templates'] = {
+        'compile_cold_ms': measure(lambda: load_templates(None), args.repeat),
+        'compile_cached_ms': measure(lambda: load_templates(FileSystemBytecodeCache(cache_dir)), args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
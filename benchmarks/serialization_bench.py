@@ -0,0 +1,76 @@
+# benchmarks/serialization_bench.py
+"""
+Сравнение сериализаторов ответа API на типичной странице новостей.
+
+  flask_default - DefaultJSONProvider Flask (stdlib json, sort_keys, ensure_ascii)
+  fast_json     - utils.serialization.FastJSONProvider (orjson, если установлен)
+  msgpack       - MessagePack (если установлен)
+
+Пример: python benchmarks/serialization_bench.py --items 20 100 1000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from utils.serialization import FastJSONProvider, msgpack, orjson  # noqa: E402
+
+PARAGRAPH = ('Сегодня в Москве прошло заседание городской думы, на котором обсуждались вопросы '
+             'благоустройства парков, ремонта дорог и строительства новых школ. ')
+
+
+def make_payload(items):
+    return {
+        'items': [{
+            'id': i,
+            'title': f'Новость номер {i}: важные события дня',
+            'content': PARAGRAPH * (5 + i % 20),
+            'user_id': i % 50 + 1,
+            'author': f'Автор{i % 50} Тестовый',
+        } for i in range(1, items + 1)],
+        'next_cursor': items,
+        'prev_cursor': None,
+    }
+
+
+def bench(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[20, 100, 1000])
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    results = {'orjson_available': orjson is not None, 'msgpack_available': msgpack is not None}
+
+    for items in args.items:
+        payload = make_payload(items)
+        number = max(1, 2000 // items)
+        row = {
+            'flask_default': {'ms': bench(lambda: default_provider.dumps(payload).encode(), number),
+                              'bytes': len(default_provider.dumps(payload).encode())},
+            'fast_json': {'ms': bench(lambda: fast_provider.dumps(payload).encode(), number),
+                          'bytes': len(fast_provider.dumps(payload).encode())},
+        }
+        # Проверка совместимости: одинаковые данные после разбора
+        assert json.loads(default_provider.dumps(payload)) == json.loads(fast_provider.dumps(payload))
+        if msgpack is not None:
+            row['msgpack'] = {'ms': bench(lambda: msgpack.packb(payload, use_bin_type=True), number),
+                              'bytes': len(msgpack.packb(payload, use_bin_type=True))}
+        results[f'{items}_items'] = row
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
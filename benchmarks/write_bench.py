@@ -0,0 +1,125 @@
+# benchmarks/write_bench.py
+"""
+Пропускная способность POST /api/news при параллельной записи.
+
+  per-request - каждый запрос фиксирует свою транзакцию (по умолчанию)
+  group       - групповая фиксация: фоновый писатель объединяет новости из параллельных
+                запросов в одну транзакцию (NEWS_GROUP_COMMIT_ENABLED, utils/write_queue.py)
+
+Каждый режим запускается в отдельном процессе на новой базе SQLite; запросы идут из
+--concurrency потоков через Flask test client, каждый поток - от своего пользователя.
+
+Пример: python benchmarks/write_bench.py --writes 3000 --concurrency 16 --config production
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test import PASSWORD, InProcessTransport, login  # noqa: E402
+
+MODES = {'per-request': '0', 'group': '1'}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    return round(statistics.quantiles(values, n=100, method='inclusive')[q - 1], 2)
+
+
+def child(config, writes, concurrency):
+    from app import create_app, init_schema
+    from utils.seed import seed_database
+
+    app = create_app(config)
+    init_schema(app)
+    with app.app_context():
+        seed_database(concurrency, 0, password=PASSWORD, log=lambda message: None)
+
+    transports = []
+    for user_id in range(1, concurrency + 1):
+        transport = InProcessTransport(app)
+        login(transport, f'seed-{user_id}@example.com')
+        transports.append(transport)
+
+    remaining = iter(range(writes))
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    latencies = []
+    statuses = {}
+
+    def worker(transport, number):
+        barrier.wait()
+        while True:
+            with lock:
+                i = next(remaining, None)
+            if i is None:
+                return
+            body = {'title': f'Новость {number}-{i}', 'content': 'Текст новости для замера записи. ' * 10}
+            t0 = time.perf_counter()
+            try:
+                status, _ = transport.request('POST', '/api/news', json_body=body)
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(t, n)) for n, t in enumerate(transports)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    return {
+        'writes_per_sec': round(statuses.get('201', 0) / duration, 1),
+        'duration_s': round(duration, 2),
+        'statuses': statuses,
+        'latency_ms': {'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95),
+                       'p99': percentile(latencies, 99)},
+    }
+
+
+def run_child(mode, args):
+    workdir = tempfile.mkdtemp(prefix='news-write-bench-')
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+               NEWS_GROUP_COMMIT=MODES[mode], ADMISSION_CONTROL='0', LOG_LEVEL='ERROR')
+    output = subprocess.run([sys.executable, __file__, '--child', '--config', args.config,
+                             '--writes', str(args.writes), '--concurrency', str(args.concurrency)],
+                            env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writes', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--modes', nargs='+', choices=tuple(MODES), default=list(MODES))
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.config, args.writes, args.concurrency)))
+        return
+
+    results = {'config': args.config, 'writes': args.writes, 'concurrency': args.concurrency}
+    for mode in args.modes:
+        results[mode] = run_child(mode, args)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,250 +1,496 @@
 # client.py
-import requests
+"""
+Клиент API новостей: синхронный NewsClient и асинхронный AsyncNewsClient (httpx).
+
+Оба клиента держат пул keep-alive соединений, повторяют запросы при сетевых ошибках
+и ответах 429/502/503/504 (с экспоненциальной задержкой и учётом Retry-After),
+умеют обходить постраничные списки и выполнять пачки запросов с ограниченной параллельностью.
+
+    with NewsClient('http://127.0.0.1:5000') as client:
+        client.login('ivan@example.com', 'пароль123')
+        for news in client.iter_news(view='summary'):
+            ...
+
+    async with AsyncNewsClient('http://127.0.0.1:5000', concurrency=32) as client:
+        items = await client.get_many_news(range(1, 1001))
+"""
+import asyncio
 import json
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Базовый URL для API
-BASE_URL = "http://127.0.0.1:5000/api"
-
-session = requests.Session()
-
-logged_in_user_id = None
-
-def register_user(first_name, last_name, email, password):
-    """Регистрирует нового пользователя через API."""
-    print(f"\n--- Регистрация пользователя: {email} ---")
-    response = session.post(f"{BASE_URL}/auth/register", json={
-        "first_name": first_name,
-        "last_name": last_name,
-        "email": email,
-        "password": password
-    })
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def login_user(email, password):
-    """Выполняет вход пользователя через API."""
-    global logged_in_user_id
-    print(f"\n--- Вход пользователя: {email} ---")
-    response = session.post(f"{BASE_URL}/auth/login", json={
-        "email": email,
-        "password": password
-    })
-    print(f"Статус: {response.status_code}")
-    res_json = {}
-    try:
-        res_json = response.json()
-        print(f"Ответ: {json.dumps(res_json, indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-
-    if response.status_code == 200:
-        logged_in_user_id = res_json.get('user_id')
-        print(f"Успешный вход. ID пользователя (если предоставлен API): {logged_in_user_id}")
-    else:
-        print("Вход не удался.")
-    return response
-
-def logout_user():
-    """Выполняет выход пользователя через API."""
-    global logged_in_user_id
-    print(f"\n--- Выход пользователя ---")
-    response = session.post(f"{BASE_URL}/auth/logout")
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    if response.status_code == 200:
-        logged_in_user_id = None # Сбросить ID вошедшего пользователя
-        print("Пользователь вышел из системы.")
-    return response
-
-
-def get_all_users():
-    """Получает список всех пользователей через API."""
-    print("\n--- Получение всех пользователей (GET /api/users/) ---")
-    response = session.get(f"{BASE_URL}/users/")
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def get_user_by_id(user_id):
-    """Получает данные пользователя по ID через API."""
-    print(f"\n--- Получение пользователя ID {user_id} (GET /api/users/{user_id}/) ---")
-    response = session.get(f"{BASE_URL}/users/{user_id}")
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def update_user(user_id, first_name=None, last_name=None, email=None, password=None):
-    """Обновляет данные пользователя по ID через API (требует аутентификации)."""
-    print(f"\n--- Обновление данных пользователя ID {user_id} (PUT /api/users/{user_id}) ---")
-    data = {}
-    if first_name: data['first_name'] = first_name
-    if last_name: data['last_name'] = last_name
-    if email: data['email'] = email
-    if password: data['password'] = password
-
-    response = session.put(f"{BASE_URL}/users/{user_id}", json=data)
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def delete_user(user_id):
-    """Удаляет пользователя по ID через API (требует аутентификации)."""
-    print(f"\n--- Удаление пользователя ID {user_id} (DELETE /api/users/{user_id}/) ---")
-    response = session.delete(f"{BASE_URL}/users/{user_id}")
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-
-def create_news(title, content):
-    """Создает новую новость через API (требует аутентификации)."""
-    print(f"\n--- Создание новости (POST /api/news/) от имени ID {logged_in_user_id} ---")
-    response = session.post(f"{BASE_URL}/news/", json={
-        "title": title,
-        "content": content
-    })
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def get_all_news():
-    """Получает список всех новостей через API."""
-    print("\n--- Получение всех новостей (GET /api/news/) ---")
-    response = session.get(f"{BASE_URL}/news/")
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def update_news(news_id, title=None, content=None):
-    """Обновляет существующую новость по ID через API (требует аутентификации и авторства)."""
-    print(f"\n--- Обновление новости ID {news_id} (PUT /api/news/{news_id}) ---")
-    data = {}
-    if title: data['title'] = title
-    if content: data['content'] = content
-
-    response = session.put(f"{BASE_URL}/news/{news_id}", json=data)
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-def delete_news(news_id):
-    """Удаляет новость по ID через API (требует аутентификации и авторства)."""
-    print(f"\n--- Удаление новости ID {news_id} (DELETE /api/news/{news_id}) ---")
-    response = session.delete(f"{BASE_URL}/news/{news_id}/")
-    print(f"Статус: {response.status_code}")
-    try:
-        print(f"Ответ: {json.dumps(response.json(), indent=2)}")
-    except json.JSONDecodeError:
-        print(f"Ответ (не JSON): {response.text}")
-    return response
-
-
-if __name__ == "__main__":
-    print("--- Запуск тестового клиента API с аутентификацией Flask-Login ---")
-
-    # 1. Регистрация первого пользователя
-    reg_res1 = register_user("Иван", "Иванов", "ivan.ivanov@example.com", "пароль123")
-    user1_id_registered = reg_res1.json().get('user_id') if reg_res1.status_code == 201 else None
-
-    # 2. Регистрация второго пользователя
-    reg_res2 = register_user("Екатерина", "Петрова", "ekat.petrova@example.com", "секретныйпароль")
-    user2_id_registered = reg_res2.json().get('user_id') if reg_res2.status_code == 201 else None
-
-    # 3. Вход первого пользователя
-    login_user("ivan.ivanov@example.com", "пароль123")
-
-    # 4. Создание новости от имени первого пользователя
-    news_res1 = create_news("Первая новость Ивана", "Контент первой новости, написанной Иваном.")
-    news1_id = news_res1.json().get('id') if news_res1.status_code == 201 else None
-
-    news_res2 = create_news("Вторая новость Ивана", "Еще контента от Ивана.")
-    news2_id = news_res2.json().get('id') if news_res2.status_code == 201 else None
-
-    # 5. Получение всех новостей (публично)
-    get_all_news()
-
-    # 6. Попытка первого пользователя обновить свою новость
-    print("\n--- Обновление новости Ивана ---")
-    if news1_id:
-        update_news(news1_id, title="Обновленная первая новость от Ивана", content="Новый, улучшенный контент от Ивана.")
-    else:
-        print("ID первой новости не получен, пропускаем обновление.")
-
-    # 7. Попытка первого пользователя обновить профиль второго (должна быть ошибка, если API защищено)
-    # Обратите внимание: API обычно позволяет пользователю обновлять только свой профиль.
-    print(f"\n--- Попытка Ивана обновить профиль Екатерины (ID: {user2_id_registered}) ---")
-    if user2_id_registered:
-        # Ожидаемый результат: 403 Forbidden или 401 Unauthorized, если API не разрешает это
-        update_user(user2_id_registered, first_name="Екатерина (изменено Иваном - неудачно)")
-    else:
-        print("ID второго пользователя не получен, пропускаем попытку обновления.")
-
-    # 8. Выход первого пользователя
-    logout_user()
-
-    # 9. Вход второго пользователя
-    login_user("ekat.petrova@example.com", "секретныйпароль")
-
-    # 10. Создание новости от имени второго пользователя
-    news_res3 = create_news("Новость от Екатерины", "Это новость, созданная Екатериной Петровой.")
-    news3_id = news_res3.json().get('id') if news_res3.status_code == 201 else None
-
-    # 11. Попытка второго пользователя обновить новость первого (должна быть ошибка)
-    print("\n--- Попытка Екатерины обновить новость Ивана (должна быть ошибка) ---")
-    if news1_id:
-        # Ожидаемый результат: 403 Forbidden, если API разрешает обновление только автору
-        update_news(news1_id, title="Новый заголовок от Екатерины (неудачно)")
-    else:
-        print("ID первой новости не получен, пропускаем попытку обновления.")
-
-    # 12. Второй пользователь удаляет свою новость
-    print("\n--- Екатерина удаляет свою новость ---")
-    if news3_id:
-        delete_news(news3_id)
-    else:
-        print("ID новости Екатерины не получен, пропускаем удаление.")
-
-    # 13. Выход второго пользователя
-    logout_user()
-
-    # 14. Вход Ивана, чтобы удалить свой профиль
-    login_user("ivan.ivanov@example.com", "пароль123")
-    print(f"\n--- Иван удаляет свой профиль (ID: {logged_in_user_id}) ---")
-    if logged_in_user_id:
-        delete_user(logged_in_user_id) # + Удаление его новостей
-    else:
-        print("ID текущего пользователя не получен, пропускаем удаление профиля.")
-
-    # 15. Проверка всех новостей и пользователей после удалений
-    get_all_news()
-    get_all_users()
-
-    print("\n--- Тестирование API с аутентификацией Flask-Login завершено ---")
\ No newline at end of file
+import httpx
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:5000'
+
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'))
+
+
+class ApiError(Exception):
+    """Ответ API с кодом ошибки. payload - разобранное тело ответа (обычно {'message': ...})."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        message = payload.get('message') if isinstance(payload, dict) else payload
+        super().__init__(f'{status_code}: {message}')
+
+
+def _params(**params):
+    return {name: value for name, value in params.items() if value is not None}
+
+
+def _fields(fields):
+    return ','.join(fields) if isinstance(fields, (list, tuple)) else fields
+
+
+def _payload(response):
+    if response.status_code == 204 or not response.content:
+        return None
+    if response.headers.get('Content-Type', '').startswith('application/json'):
+        return response.json()
+    return response.text
+
+
+def _check(response):
+    payload = _payload(response)
+    if response.status_code >= 400:
+        raise ApiError(response.status_code, payload)
+    return payload
+
+
+def _sse_event(fields, line):
+    """
+    Разбирает строку потока SSE. Поля события копятся в fields; на пустой строке (конец события)
+    возвращает данные события (изменение новости), иначе None. Комментарии (': ping') пропускаются.
+    """
+    if not line:
+        data = fields.pop('data', None)
+        fields.clear()
+        return json.loads(data) if data is not None else None
+    if line.startswith(':'):
+        return None
+    name, _, value = line.partition(':')
+    fields[name] = value[1:] if value.startswith(' ') else value
+    return None
+
+
+def _stream_request(since, read_timeout, connect_timeout):
+    # Между событиями сервер присылает пинги раз в NEWS_STREAM_HEARTBEAT секунд - тайм-аут чтения больше
+    headers = {'Last-Event-ID': str(since)} if since is not None else {}
+    return {'headers': headers, 'timeout': httpx.Timeout(connect_timeout, read=read_timeout)}
+
+
+def _login_result(response):
+    # Форма входа при успехе перенаправляет на главную, при ошибке - обратно на /login
+    location = response.headers.get('Location', '')
+    if response.status_code != 302 or location.endswith('/login'):
+        raise ApiError(response.status_code, {'message': 'Неправильный email или пароль'})
+
+
+class _Routes:
+    """
+    Методы, повторяющие маршруты api_bp. Каждый метод возвращает результат self._call:
+    в синхронном клиенте - готовые данные, в асинхронном - корутину.
+    """
+
+    # --- Новости ---
+
+    def list_news(self, limit=None, after=None, before=None, fields=None, view=None):
+        """GET /api/news - страница новостей: {'items', 'next_cursor', 'prev_cursor'}."""
+        return self._call('GET', '/api/news', params=_params(limit=limit, after=after, before=before,
+                                                               fields=_fields(fields), view=view))
+
+    def search_news(self, q, limit=None, offset=None):
+        """GET /api/news/search - полнотекстовый поиск: {'items', 'next_offset'}."""
+        return self._call('GET', '/api/news/search', params=_params(q=q, limit=limit, offset=offset))
+
+    def news_changes(self, since=0, limit=None):
+        """GET /api/news/changes - изменения после курсора: {'items', 'next_cursor', 'has_more'}."""
+        return self._call('GET', '/api/news/changes', params=_params(since=since, limit=limit))
+
+    def get_news(self, news_id, fields=None, view=None):
+        """GET /api/news/<id>."""
+        return self._call('GET', f'/api/news/{news_id}', params=_params(fields=_fields(fields), view=view))
+
+    def create_news(self, title, content):
+        """POST /api/news (нужен вход)."""
+        return self._call('POST', '/api/news', json={'title': title, 'content': content})
+
+    def update_news(self, news_id, title=None, content=None):
+        """PUT /api/news/<id> (только автор)."""
+        return self._call('PUT', f'/api/news/{news_id}', json=_params(title=title, content=content))
+
+    def delete_news(self, news_id):
+        """DELETE /api/news/<id> (только автор)."""
+        return self._call('DELETE', f'/api/news/{news_id}')
+
+    def create_news_batch(self, items):
+        """POST /api/news/batch - items: [{'title', 'content'}, ...]."""
+        return self._call('POST', '/api/news/batch', json=list(items))
+
+    def update_news_batch(self, items):
+        """PATCH /api/news/batch - items: [{'id', 'title'?, 'content'?}, ...]."""
+        return self._call('PATCH', '/api/news/batch', json=list(items))
+
+    def delete_news_batch(self, news_ids):
+        """DELETE /api/news/batch - список id."""
+        return self._call('DELETE', '/api/news/batch', json=list(news_ids))
+
+    # --- Пользователи ---
+
+    def list_user_news(self, user_id, limit=None, after=None, before=None, fields=None, view=None):
+        """GET /api/users/<id>/news - страница новостей автора: {'items', 'next_cursor', 'prev_cursor'}."""
+        return self._call('GET', f'/api/users/{user_id}/news', params=_params(
+            limit=limit, after=after, before=before, fields=_fields(fields), view=view))
+
+    def list_users(self, limit=None, after=None, before=None):
+        """GET /api/users - страница пользователей."""
+        return self._call('GET', '/api/users', params=_params(limit=limit, after=after, before=before))
+
+    def get_user(self, user_id):
+        """GET /api/users/<id>."""
+        return self._call('GET', f'/api/users/{user_id}')
+
+    def register_user(self, first_name, last_name, email, password):
+        """POST /api/users - регистрация."""
+        return self._call('POST', '/api/users', json={
+            'first_name': first_name, 'last_name': last_name, 'email': email, 'password': password})
+
+    def update_user(self, user_id, first_name=None, last_name=None, email=None, password=None):
+        """PUT /api/users/<id> (только свой профиль)."""
+        return self._call('PUT', f'/api/users/{user_id}', json=_params(
+            first_name=first_name, last_name=last_name, email=email, password=password))
+
+    def delete_user(self, user_id):
+        """DELETE /api/users/<id> - удаляет свой профиль вместе с новостями и выходит из системы."""
+        return self._call('DELETE', f'/api/users/{user_id}')
+
+
+class NewsClient(_Routes):
+    """
+    Синхронный клиент. Потокобезопасен: один экземпляр можно использовать из нескольких
+    потоков (так работают get_many_news / create_many_news).
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, concurrency=8, retries=3, backoff=0.2, timeout=10.0):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.http = httpx.Client(
+            base_url=base_url, timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.http.close()
+
+    def _send(self, method, path, **kwargs):
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self.http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.retries or not _can_retry(method, e):
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                if method not in IDEMPOTENT_METHODS and response.status_code != 429:
+                    return response
+            time.sleep(_delay(self.backoff, attempt, response))
+            attempt += 1
+
+    def _call(self, method, path, **kwargs):
+        return _check(self._send(method, path, **kwargs))
+
+    def login(self, email, password):
+        """Вход через HTML-форму /login (cookie сессии сохраняется в клиенте)."""
+        match = CSRF_RE.search(self._send('GET', '/login').text)
+        form = {'email': email, 'password': password}
+        if match:
+            form['csrf_token'] = match.group(1)
+        _login_result(self._send('POST', '/login', data=form))
+
+    def logout(self):
+        self._send('GET', '/logout')
+
+    def export_news(self, format='ndjson', user_id=None, after=None, before=None):
+        """GET /api/news/export - построчный поток выгрузки (NDJSON или CSV) без загрузки всего ответа."""
+        params = _params(format=format, user_id=user_id, after=after, before=before)
+        with self.http.stream('GET', '/api/news/export', params=params) as response:
+            if response.status_code >= 400:
+                response.read()
+                _check(response)
+            yield from response.iter_lines()
+
+    def stream_news(self, since=None, reconnect=True, read_timeout=60.0):
+        """
+        GET /api/news/stream - изменения новостей по мере появления (SSE), бесконечный генератор.
+        since - курсор (id изменения), с которого досылаются пропущенные; без него - только новые.
+        Когда сервер закрывает поток (клиент отстал), переподключается с последним полученным id.
+        """
+        while True:
+            options = _stream_request(since, read_timeout, self.http.timeout.connect)
+            with self.http.stream('GET', '/api/news/stream', **options) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    _check(response)
+                fields = {}
+                for line in response.iter_lines():
+                    change = _sse_event(fields, line)
+                    if change is not None:
+                        since = change['id']
+                        yield change
+            if not reconnect:
+                return
+
+    # --- Обход страниц ---
+
+    def iter_news(self, page_size=None, fields=None, view=None, after=None):
+        """Все новости по возрастанию id, страница за страницей (keyset-курсор)."""
+        while True:
+            page = self.list_news(limit=page_size, after=after, fields=fields, view=view)
+            yield from page['items']
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    def iter_user_news(self, user_id, page_size=None, fields=None, view=None, after=None):
+        """Все новости автора по возрастанию id."""
+        while True:
+            page = self.list_user_news(user_id, limit=page_size, after=after, fields=fields, view=view)
+            yield from page['items']
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    def iter_users(self, page_size=None, after=None):
+        while True:
+            page = self.list_users(limit=page_size, after=after)
+            yield from page['items']
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    def iter_changes(self, since=0, page_size=None):
+        """Все изменения после курсора since; последний курсор - id последнего изменения."""
+        while True:
+            page = self.news_changes(since=since, limit=page_size)
+            yield from page['items']
+            since = page['next_cursor']
+            if not page['has_more']:
+                return
+
+    # --- Параллельные операции ---
+
+    def _map(self, func, items):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return list(executor.map(func, items))
+
+    def get_many_news(self, news_ids, fields=None):
+        """Новости по списку id, не более concurrency запросов одновременно. Порядок сохраняется."""
+        return self._map(lambda news_id: self.get_news(news_id, fields=fields), news_ids)
+
+    def create_many_news(self, items, batch_size=500):
+        """
+        Создаёт новости пачками по batch_size через /api/news/batch; пачки отправляются параллельно.
+        Возвращает id созданных новостей в порядке items.
+        """
+        items = list(items)
+        batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+        results = self._map(self.create_news_batch, batches)
+        return [result['id'] for batch in results for result in batch['results']]
+
+
+class AsyncNewsClient(_Routes):
+    """Асинхронный клиент для asyncio. Параллельность пачек ограничивается семафором."""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, concurrency=32, retries=3, backoff=0.2, timeout=10.0):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.http = httpx.AsyncClient(
+            base_url=base_url, timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def _send(self, method, path, **kwargs):
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await self.http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.retries or not _can_retry(method, e):
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                if method not in IDEMPOTENT_METHODS and response.status_code != 429:
+                    return response
+            await asyncio.sleep(_delay(self.backoff, attempt, response))
+            attempt += 1
+
+    async def _call(self, method, path, **kwargs):
+        return _check(await self._send(method, path, **kwargs))
+
+    async def login(self, email, password):
+        match = CSRF_RE.search((await self._send('GET', '/login')).text)
+        form = {'email': email, 'password': password}
+        if match:
+            form['csrf_token'] = match.group(1)
+        _login_result(await self._send('POST', '/login', data=form))
+
+    async def logout(self):
+        await self._send('GET', '/logout')
+
+    async def export_news(self, format='ndjson', user_id=None, after=None, before=None):
+        params = _params(format=format, user_id=user_id, after=after, before=before)
+        async with self.http.stream('GET', '/api/news/export', params=params) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                _check(response)
+            async for line in response.aiter_lines():
+                yield line
+
+    async def stream_news(self, since=None, reconnect=True, read_timeout=60.0):
+        while True:
+            options = _stream_request(since, read_timeout, self.http.timeout.connect)
+            async with self.http.stream('GET', '/api/news/stream', **options) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    _check(response)
+                fields = {}
+                async for line in response.aiter_lines():
+                    change = _sse_event(fields, line)
+                    if change is not None:
+                        since = change['id']
+                        yield change
+            if not reconnect:
+                return
+
+    # --- Обход страниц ---
+
+    async def iter_news(self, page_size=None, fields=None, view=None, after=None):
+        while True:
+            page = await self.list_news(limit=page_size, after=after, fields=fields, view=view)
+            for item in page['items']:
+                yield item
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    async def iter_user_news(self, user_id, page_size=None, fields=None, view=None, after=None):
+        while True:
+            page = await self.list_user_news(user_id, limit=page_size, after=after, fields=fields, view=view)
+            for item in page['items']:
+                yield item
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    async def iter_users(self, page_size=None, after=None):
+        while True:
+            page = await self.list_users(limit=page_size, after=after)
+            for item in page['items']:
+                yield item
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    async def iter_changes(self, since=0, page_size=None):
+        while True:
+            page = await self.news_changes(since=since, limit=page_size)
+            for item in page['items']:
+                yield item
+            since = page['next_cursor']
+            if not page['has_more']:
+                return
+
+    # --- Параллельные операции ---
+
+    async def _map(self, func, items):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(item):
+            async with semaphore:
+                return await func(item)
+        return await asyncio.gather(*(run(item) for item in items))
+
+    async def get_many_news(self, news_ids, fields=None):
+        return await self._map(lambda news_id: self.get_news(news_id, fields=fields), news_ids)
+
+    async def create_many_news(self, items, batch_size=500):
+        items = list(items)
+        batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+        results = await self._map(self.create_news_batch, batches)
+        return [result['id'] for batch in results for result in batch['results']]
+
+
+def _can_retry(method, error):
+    # Неидемпотентный запрос повторяем, только если он точно не был отправлен
+    return method in IDEMPOTENT_METHODS or isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def _delay(backoff, attempt, response=None):
+    """Задержка перед повтором: Retry-After сервера или экспоненциальная с разбросом."""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+    return backoff * 2 ** attempt * (0.5 + random.random())
+
+
+if __name__ == '__main__':
+    # Демонстрационный сценарий: два пользователя, их новости и проверка прав доступа
+    with NewsClient() as client:
+        ivan = client.register_user('Иван', 'Иванов', 'ivan.ivanov@example.com', 'пароль123')
+        ekaterina = client.register_user('Екатерина', 'Петрова', 'ekat.petrova@example.com', 'секретныйпароль')
+        print('Зарегистрированы:', ivan, ekaterina)
+
+        client.login('ivan.ivanov@example.com', 'пароль123')
+        first = client.create_news('Первая новость Ивана', 'Контент первой новости, написанной Иваном.')
+        client.create_news('Вторая новость Ивана', 'Еще контента от Ивана.')
+        print('Новости:', client.list_news(view='summary'))
+        print('Обновлена:', client.update_news(first['id'], title='Обновленная первая новость от Ивана'))
+        try:
+            client.update_user(ekaterina['id'], first_name='Екатерина (изменено Иваном)')
+        except ApiError as e:
+            print('Ожидаемая ошибка при изменении чужого профиля:', e)
+        client.logout()
+
+        client.login('ekat.petrova@example.com', 'секретныйпароль')
+        own = client.create_news('Новость от Екатерины', 'Это новость, созданная Екатериной Петровой.')
+        try:
+            client.update_news(first['id'], title='Новый заголовок от Екатерины')
+        except ApiError as e:
+            print('Ожидаемая ошибка при изменении чужой новости:', e)
+        client.delete_news(own['id'])
+        client.logout()
+
+        client.login('ivan.ivanov@example.com', 'пароль123')
+        client.delete_user(ivan['id'])  # вместе с новостями Ивана
+
+        print('Новости после удалений:', list(client.iter_news()))
+        print('Пользователи:', list(client.iter_users()))
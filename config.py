@@ -1,8 +1,203 @@
 # config.py
 
 import os
+from sqlalchemy.pool import StaticPool
+
+DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
+
 
 class Config:
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///app.db'
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'secret_key_by_OSU'
\ No newline at end of file
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'secret_key_by_OSU'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+
+    # Параметры движка SQLAlchemy (пул соединений) и PRAGMA, выполняемые
+    # на каждом новом соединении SQLite (см. db_instance.configure_engines)
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    # Необязательная реплика только для чтения: GET-запросы читают из неё (db_instance.RoutingSession).
+    # После записи клиент ещё REPLICA_STICKY_SECONDS читает основную БД, чтобы видеть свои изменения
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    REPLICA_STICKY_SECONDS = 5
+
+    # Создавать и обновлять схему БД при создании приложения. В production схему
+    # готовит команда flask init-db до запуска рабочих процессов
+    AUTO_CREATE_SCHEMA = True
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000,  # мс ожидания блокировки вместо мгновенного "database is locked"
+        'foreign_keys': 'ON',  # SQLite по умолчанию не проверяет внешние ключи и не выполняет ON DELETE CASCADE
+    }
+
+    # Хеширование паролей: метод и стоимость в формате werkzeug, пул исполнителей и его ограничения.
+    # При входе хеши со старыми параметрами пересчитываются автоматически.
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+    PASSWORD_HASH_EXECUTOR = 'thread'  # 'thread' или 'process'
+    PASSWORD_HASH_WORKERS = os.cpu_count() or 2
+    PASSWORD_HASH_QUEUE_LIMIT = 32
+    PASSWORD_HASH_TIMEOUT = 10  # секунды
+
+    # Постраничный вывод (keyset pagination) для списков новостей и пользователей
+    NEWS_PER_PAGE = 20
+    USERS_PER_PAGE = 50
+    MAX_PER_PAGE = 100
+
+    # Длина отрывка текста в режиме ?view=summary
+    NEWS_EXCERPT_LENGTH = 200
+
+    # Максимальный размер пакета для /api/news/batch
+    NEWS_BATCH_MAX_SIZE = 1000
+
+    # Размер пачки строк при потоковой выгрузке /api/news/export
+    EXPORT_BATCH_SIZE = 1000
+
+    # Кеш ответов публичных GET-маршрутов (список новостей, новость, главная страница)
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_SIZE = 1024
+    RESPONSE_CACHE_TTL = 60  # секунды
+
+    # Кеш отрисованных фрагментов новостей и каталог кеша байткода шаблонов Jinja
+    # (None - instance/jinja_cache)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_SIZE = 10000
+    FRAGMENT_CACHE_TTL = 600  # секунды
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR')
+
+    # Кеш пользователей для Flask-Login (загрузка current_user без запроса к БД на каждом GET)
+    USER_CACHE_ENABLED = True
+    USER_CACHE_SIZE = 4096
+    USER_CACHE_TTL = 30  # секунды
+
+    # Сжатие ответов (gzip, brotli при наличии библиотеки)
+    COMPRESS_ENABLED = True
+    COMPRESS_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+    COMPRESS_MIN_SIZE = 500  # байт
+    COMPRESS_MIMETYPES = [
+        'text/html', 'text/css', 'text/plain', 'text/csv', 'application/javascript',
+        'application/json', 'application/x-ndjson', 'application/msgpack',
+    ]
+
+    # Журнал изменений новостей (/api/news/changes) и SSE-поток /api/news/stream
+    NEWS_CHANGES_RETENTION_DAYS = 7  # очистка: flask --app app prune-news-changes
+    NEWS_STREAM_POLL_INTERVAL = 1.0  # сек между опросами журнала фоновым потоком
+    NEWS_STREAM_HEARTBEAT = 15  # сек простоя до комментария-пинга в потоке
+    NEWS_STREAM_QUEUE_SIZE = 100  # пачек событий в очереди подписчика до его отключения
+    NEWS_STREAM_BACKLOG = 500  # событий, досылаемых по Last-Event-ID за одно подключение
+    # Подписчиков потока на рабочий процесс; сверх лимита - 503. Каждый подписчик занимает поток
+    # сервера на всё время подключения, gunicorn.conf.py уменьшает лимит под число потоков gthread
+    NEWS_STREAM_MAX_SUBSCRIBERS = int(os.environ.get('NEWS_STREAM_MAX_SUBSCRIBERS') or 1000)
+
+    # Групповая фиксация POST /api/news: новости из параллельных запросов пишутся одной транзакцией
+    NEWS_GROUP_COMMIT_ENABLED = os.environ.get('NEWS_GROUP_COMMIT', '').lower() in ('1', 'true', 'yes')
+    NEWS_GROUP_COMMIT_WINDOW_MS = 5  # сколько писатель ждёт следующие новости после первой
+    NEWS_GROUP_COMMIT_MAX_BATCH = 100  # новостей в одной транзакции
+    NEWS_GROUP_COMMIT_QUEUE_LIMIT = 1000  # при полной очереди запрос получает 503
+    NEWS_GROUP_COMMIT_TIMEOUT = 5  # сек ожидания записи до ответа 503
+
+    # Ограничение нагрузки (utils/limits.py). Класс маршрута задаётся по 'МЕТОД эндпоинт' или по эндпоинту
+    ADMISSION_CONTROL_ENABLED = os.environ.get('ADMISSION_CONTROL', '1').lower() in ('1', 'true', 'yes')
+    ADMISSION_ROUTE_CLASSES = {
+        # Хеширование пароля
+        'POST main.login': 'auth',
+        'POST main.register': 'auth',
+        'POST api_bp.register_user_api': 'auth',
+        # Списки, поиск и выгрузка новостей
+        'api_bp.get_news_api': 'scan',
+        'api_bp.search_news_api': 'scan',
+        'api_bp.export_news_api': 'scan',
+        'api_bp.get_users_api': 'scan',
+        'api_bp.get_user_news_api': 'scan',
+        # Запись новостей
+        'POST main.add_news': 'write',
+        'POST api_bp.add_news_api': 'write',
+        'POST api_bp.add_news_batch_api': 'write',
+        'PATCH api_bp.update_news_batch_api': 'write',
+        'DELETE api_bp.delete_news_batch_api': 'write',
+    }
+    # Одновременных запросов класса на рабочий процесс
+    ADMISSION_CONCURRENCY = {
+        'auth': (os.cpu_count() or 2) * 2,
+        'scan': 8,
+    }
+    ADMISSION_QUEUE_TIMEOUT = 0.05  # сек ожидания свободного места до ответа 503
+    # (запросов в секунду, запас) на клиента (адрес) и на пользователя (id из сессии)
+    ADMISSION_RATE_LIMITS = {
+        'auth': {'client': (1, 10)},
+        'scan': {'client': (20, 40)},
+        'write': {'user': (10, 50)},
+    }
+    ADMISSION_MAX_KEYS = 100000  # корзин токенов в памяти процесса
+    # Сколько прокси (nginx и т.п.) стоит перед приложением. Адрес клиента для лимитов берётся из
+    # X-Forwarded-For с учётом этого числа (werkzeug ProxyFix); иначе все клиенты за прокси делят одну
+    # корзину. 0 - приложение доступно напрямую: заголовку, который может подделать клиент, не верим
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT') or 0)
+
+    # Метрики запросов (/metrics) и порог для записи медленных запросов в лог
+    METRICS_ENABLED = True
+    SLOW_REQUEST_THRESHOLD_MS = 500
+
+
+class DevelopmentConfig(Config):
+    pass
+
+
+class LocalReplicaConfig(DevelopmentConfig):
+    """
+    Локальная проверка чтения из реплики: копия основной БД в instance/replica.db,
+    обновляемая командой flask --app app replica-sync [--interval N].
+    """
+    SQLALCHEMY_BINDS = {'replica': Config.REPLICA_DATABASE_URL or 'sqlite:///replica.db'}
+
+
+class ProductionConfig(Config):
+    AUTO_CREATE_SCHEMA = False
+    # WAL: читатели не блокируют писателя; synchronous=NORMAL в режиме WAL
+    # не делает fsync на каждый коммит, оставаясь устойчивым к падению процесса
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+        'cache_size': -64000,  # 64 МБ страничного кеша на соединение
+        'mmap_size': 268435456,  # 256 МБ
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
+
+
+class TestingConfig(Config):
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    # Одна общая in-memory база для всех потоков
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    SQLALCHEMY_BINDS = {}
+    # Все запросы тестового клиента приходят с одного адреса
+    ADMISSION_CONTROL_ENABLED = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    RESPONSE_CACHE_ENABLED = False
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'local-replica': LocalReplicaConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    """Возвращает класс конфигурации по имени профиля или из переменной окружения APP_CONFIG."""
+    name = name or os.environ.get('APP_CONFIG') or 'development'
+    if name not in config_by_name:
+        raise ValueError(f'Неизвестный профиль конфигурации: {name}')
+    return config_by_name[name]
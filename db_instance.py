@@ -1,4 +1,132 @@
 # db_instance.py
+import sqlite3
+import time
+from functools import partial
+from flask import g, has_request_context, request, session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
 
-db = SQLAlchemy()
\ No newline at end of file
+REPLICA_BIND = 'replica'
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class RoutingSession(Session):
+    """
+    Сессия, направляющая чтение в реплику (bind 'replica' из SQLALCHEMY_BINDS), если она настроена.
+
+    В реплику идут только запросы внутри GET/HEAD-запросов. Всё остальное читает основную БД:
+    запись (flush, INSERT/UPDATE/DELETE), всё, что выполняется после записи в той же сессии
+    (чтение своих изменений), фоновые задачи и CLI. Клиент, только что что-то изменивший, ещё
+    REPLICA_STICKY_SECONDS читает основную БД и видит свои изменения, даже если реплика отстаёт.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause):
+        if self.info.get('primary'):
+            return False
+        if self._flushing or getattr(clause, 'is_dml', False):
+            # С этого момента сессия читает только основную БД
+            self.info['primary'] = True
+            if has_request_context():
+                g.db_wrote = True
+            return False
+        if not has_request_context() or request.method not in READ_METHODS:
+            return False
+        return session.get('_primary_until', 0) < time.time()
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def mark_primary_write():
+    """Отмечает запись в основную БД, сделанную мимо сессии запроса (например, фоновым писателем)."""
+    g.db_wrote = True
+
+
+def _apply_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+
+def configure_engines(app):
+    """
+    Навешивает PRAGMA из SQLITE_PRAGMAS на каждое новое соединение SQLite.
+    Для других СУБД действуют только параметры пула из SQLALCHEMY_ENGINE_OPTIONS.
+    Соединения с репликой SQLite открываются только для чтения (query_only).
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+            engine_pragmas = dict(pragmas, query_only='ON') if bind_key == REPLICA_BIND else pragmas
+            if engine_pragmas:
+                event.listen(engine, 'connect', partial(_apply_pragmas, engine_pragmas))
+        replica_enabled = REPLICA_BIND in db.engines
+
+    if replica_enabled:
+        sticky = app.config['REPLICA_STICKY_SECONDS']
+
+        @app.after_request
+        def _stick_to_primary(response):
+            # Следующие запросы этого клиента какое-то время читают основную БД
+            if g.get('db_wrote') and sticky:
+                session['_primary_until'] = time.time() + sticky
+            return response
+
+
+def sync_replica(app):
+    """
+    Копирует основную БД SQLite в файл реплики (sqlite3 backup API) - замена настоящей
+    репликации для локальной проверки. Возвращает время копирования в секундах.
+    """
+    with app.app_context():
+        primary = db.engines[None]
+        replica = db.engines[REPLICA_BIND]
+        if primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+            raise ValueError('Копирование поддерживается только для SQLite')
+        started = time.perf_counter()
+        source = sqlite3.connect(primary.url.database)
+        target = sqlite3.connect(replica.url.database, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        return time.perf_counter() - started
+
+
+def dispose_engines(app):
+    """
+    Сбрасывает пулы соединений, унаследованные от родительского процесса после fork.
+    close=False: соединения родителя не закрываются (они всё ещё его), а просто забываются.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def report_engine_settings(app):
+    """Пишет в лог фактические настройки движков: URL, пул и значения PRAGMA."""
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            pool = engine.pool
+            lines = [
+                f'database[{bind_key or "default"}]: {engine.url.render_as_string(hide_password=True)}',
+                f'  pool: {type(pool).__name__} {pool.status()}',
+            ]
+            if engine.dialect.name == 'sqlite':
+                with engine.connect() as conn:
+                    for name in app.config.get('SQLITE_PRAGMAS') or {}:
+                        value = conn.execute(text(f'PRAGMA {name}')).scalar()
+                        lines.append(f'  pragma {name} = {value}')
+            app.logger.info('\n'.join(lines))
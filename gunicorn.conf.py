@@ -0,0 +1,50 @@
+# gunicorn.conf.py
+"""
+Настройки gunicorn: несколько рабочих процессов с потоками (gthread).
+
+Приложение загружается один раз в мастер-процессе (preload_app) и наследуется рабочими
+процессами через fork - импорт, создание приложения и компиляция шаблонов не повторяются
+в каждом процессе. После fork каждый процесс сбрасывает унаследованные пулы (post_fork).
+За nginx или другим обратным прокси задайте TRUSTED_PROXY_COUNT=1 (см. config.py): иначе лимиты
+частоты запросов считают всех клиентов одним адресом прокси.
+
+Поток /api/news/stream (SSE) держит соединение открытым. В gthread каждый подписчик занимает
+поток на всё время подключения, поэтому подписчиков на процесс не больше половины потоков
+(NEWS_STREAM_MAX_SUBSCRIBERS), остальные получают 503. Для тысяч подписчиков поток обслуживается
+отдельным экземпляром на асинхронном рабочем процессе (pip install gevent), а прокси направляет
+туда /api/news/stream:
+
+    GUNICORN_WORKER_CLASS=gevent BIND=127.0.0.1:5001 gunicorn -c gunicorn.conf.py wsgi:app
+
+В режиме gevent приложение загружается в каждом рабочем процессе уже после monkey patching
+(без preload_app), а простаивающий подписчик стоит одного гринлета.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND') or f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count() * 2 + 1)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or 'gthread'
+if worker_class == 'gevent':
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 2000)
+    preload_app = False
+    os.environ.setdefault('NEWS_STREAM_MAX_SUBSCRIBERS', str(worker_connections - 100))
+else:
+    # Каждый поток обслуживает одно соединение; подписчикам потока достаётся не больше половины потоков
+    threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+    preload_app = True
+    os.environ.setdefault('NEWS_STREAM_MAX_SUBSCRIBERS', str(max(1, threads // 2)))
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+# Периодический перезапуск рабочих процессов ограничивает рост памяти
+max_requests = 10000
+max_requests_jitter = 1000
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return  # приложение ещё не создано: каждый процесс создаст его сам
+    from app import reset_after_fork
+    reset_after_fork(server.app.wsgi())
@@ -1,35 +1,91 @@
 # models.py
+from datetime import datetime, timezone
 from db_instance import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from flask_login import UserMixin
+from utils.hashing import password_hasher
+
+
+def utcnow():
+    # В БД храним наивное время в UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
-    news = db.relationship('News', backref='author', lazy=True, cascade='all, delete-orphan')
+    password = db.Column(db.String(256), nullable=False)
+    # Число новостей автора; поддерживается при записи (см. adjust_news_count), а не считается COUNT(*)
+    news_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Новости удаляет сама БД (ON DELETE CASCADE): при удалении пользователя ORM их не загружает
+    news = db.relationship('News', back_populates='author', lazy=True, cascade='all, delete-orphan',
+                           passive_deletes=True)
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password)
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
 
     def to_dict(self):
         return {
             'id': self.id,
             'first_name': self.first_name,
             'last_name': self.last_name,
-            'email': self.email
+            'email': self.email,
+            'news_count': self.news_count
         }
 
+class UserIdentity(UserMixin):
+    """
+    Лёгкая копия пользователя для current_user: только то, что нужно шаблонам и проверкам
+    владения. Не привязана к сессии SQLAlchemy, поэтому её можно держать в кеше.
+    """
+
+    def __init__(self, id, first_name, last_name, email):
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.first_name, user.last_name, user.email)
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
 class News(db.Model):
+    # Новости автора по порядку id: и фильтр, и сортировка берутся из одного индекса.
+    # Он же служит внешнему ключу при каскадном удалении.
+    # AUTOINCREMENT: SQLite не выдаёт повторно id удалённых новостей, иначе новая новость
+    # получила бы ETag и ключи кешей удалённой (id, ревизия 1 и автор совпадают)
+    __table_args__ = (
+        db.Index('ix_news_user_id_id', 'user_id', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    # Номер ревизии и время изменения - для ETag / Last-Modified
+    revision = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    # Объявлена явно, а не через backref: атрибут News.author должен существовать сразу после импорта,
+    # а не появляться только при настройке мапперов первым запросом через ORM
+    author = db.relationship('User', back_populates='news')
 
     def to_dict(self, include_author=False):
         data = {
@@ -39,5 +95,160 @@ class News(db.Model):
             'user_id': self.user_id
         }
         if include_author:
-            data['author'] = f"{self.author.first_name} {self.author.last_name}"
-        return data
\ No newline at end of file
+            # Автор должен быть загружен вместе с новостью (joinedload), иначе это отдельный SELECT
+            data['author'] = self.author.full_name
+        return data
+
+class TableVersion(db.Model):
+    """
+    Счётчик версий таблицы: увеличивается при каждой записи, влияющей на выдачу.
+    Позволяет ответить 304 Not Modified, не загружая сами строки.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+
+class NewsChange(db.Model):
+    """
+    Журнал изменений новостей. id монотонно растёт (AUTOINCREMENT не переиспользует номера
+    после очистки) и служит курсором для /api/news/changes и потока /api/news/stream.
+    """
+    __tablename__ = 'news_change'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    news_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # create, update, delete
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
+
+
+def record_news_changes(session, op, news_ids):
+    """
+    Пишет записи журнала изменений в текущей транзакции.
+    Нужна для пакетных операций, которые идут мимо ORM; изменения через ORM записываются автоматически.
+    """
+    if not news_ids:
+        return
+    now = utcnow()
+    session.connection().execute(
+        db.insert(NewsChange), [{'news_id': news_id, 'op': op, 'created_at': now} for news_id in news_ids]
+    )
+    session.info['news_changed'] = True
+
+
+def adjust_news_count(session, counts):
+    """Изменяет User.news_count: counts - {id автора: приращение}. Один UPDATE на автора."""
+    params = [{'b_id': user_id, 'b_delta': delta} for user_id, delta in counts.items() if delta]
+    if not params:
+        return
+    table = User.__table__
+    session.connection().execute(
+        db.update(table)
+        .where(table.c.id == db.bindparam('b_id'))
+        .values(news_count=table.c.news_count + db.bindparam('b_delta')),
+        params
+    )
+    session.info.setdefault('news_count_changed', set()).update(counts)
+
+
+def recount_news(connection):
+    """Пересчитывает news_count всех пользователей одним запросом (миграция, массовая загрузка)."""
+    user, news = User.__table__, News.__table__
+    connection.execute(
+        db.update(user).values(
+            news_count=db.select(db.func.count()).where(news.c.user_id == user.c.id).scalar_subquery()
+        )
+    )
+
+
+def table_version(session, name):
+    """Текущая версия таблицы и время её изменения: (version, updated_at)."""
+    row = session.execute(
+        db.select(TableVersion.version, TableVersion.updated_at).where(TableVersion.name == name)
+    ).one()
+    return row.version, row.updated_at
+
+
+def bump_table_version(session, name):
+    """Увеличивает версию таблицы в текущей транзакции."""
+    session.execute(
+        db.update(TableVersion)
+        .where(TableVersion.name == name)
+        .values(version=TableVersion.version + 1, updated_at=utcnow())
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_news_changes(session, flush_context, instances):
+    """
+    Ведёт ревизии новостей и версию таблицы news для любых изменений через ORM.
+    Изменение имени или удаление автора тоже меняет выдачу новостей.
+    """
+    changed = False
+    for obj in session.new:
+        if isinstance(obj, News):
+            changed = True
+    for obj in session.dirty:
+        if isinstance(obj, News) and session.is_modified(obj, include_collections=False):
+            obj.revision = (obj.revision or 1) + 1
+            obj.updated_at = utcnow()
+            changed = True
+        elif isinstance(obj, User):
+            attrs = inspect(obj).attrs
+            if attrs.first_name.history.has_changes() or attrs.last_name.history.has_changes():
+                changed = True
+    deleted_users = []
+    deleted_news = []
+    for obj in session.deleted:
+        if isinstance(obj, (News, User)):
+            changed = True
+        if isinstance(obj, User):
+            deleted_users.append(obj.id)
+        elif isinstance(obj, News):
+            deleted_news.append(obj.id)
+    if changed:
+        bump_table_version(session, 'news')
+    if deleted_users:
+        # Новости удаляются внешним ключом ON DELETE CASCADE и в сессию не попадают -
+        # записываем их удаление в журнал одним INSERT ... SELECT, пока строки ещё существуют.
+        # Уже загруженные в сессию новости запишет _log_news_changes
+        session.connection().execute(
+            db.insert(NewsChange).from_select(
+                ['news_id', 'op', 'created_at'],
+                db.select(News.id, db.literal('delete'), db.literal(utcnow(), db.DateTime))
+                .where(News.user_id.in_(deleted_users), News.id.not_in(deleted_news))
+            )
+        )
+        session.info['news_changed'] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _log_news_changes(session, flush_context):
+    """Записывает в журнал изменения новостей через ORM (id новых строк известны только после flush)."""
+    record_news_changes(session, 'create', [obj.id for obj in session.new if isinstance(obj, News)])
+    record_news_changes(session, 'update', [
+        obj.id for obj in session.dirty
+        if isinstance(obj, News) and session.is_modified(obj, include_collections=False)
+    ])
+    record_news_changes(session, 'delete', [obj.id for obj in session.deleted if isinstance(obj, News)])
+
+    # Счётчики авторов; новости удаляемого пользователя не учитываем - его строка удаляется
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    counts = {}
+    for obj in session.new:
+        if isinstance(obj, News):
+            counts[obj.user_id] = counts.get(obj.user_id, 0) + 1
+    for obj in session.deleted:
+        if isinstance(obj, News) and obj.user_id not in deleted_users:
+            counts[obj.user_id] = counts.get(obj.user_id, 0) - 1
+    adjust_news_count(session, counts)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _expire_news_counts(session, flush_context):
+    # Счётчик менялся в обход ORM - у загруженных в сессию авторов он устарел
+    for user_id in session.info.pop('news_count_changed', ()):
+        user = session.identity_map.get(inspect(User).identity_key_from_primary_key((user_id,)))
+        if user is not None:
+            session.expire(user, ['news_count'])
@@ -14,5 +14,8 @@ curl --silent --show-error --retry 5 https://bootstrap.pypa.io/pip/3.7/get-pip.p
 fi
 # Install the requirements
 $VIRTUALENV/bin/pip install -r requirements.txt
-# Run your glorious application
-$VIRTUALENV/bin/python3 app.py
+# Create or upgrade the database schema once, before the workers start
+export APP_CONFIG=${APP_CONFIG:-production}
+$VIRTUALENV/bin/flask --app wsgi init-db
+# Run your glorious application: multi-process WSGI server (see gunicorn.conf.py)
+exec $VIRTUALENV/bin/gunicorn -c gunicorn.conf.py wsgi:app
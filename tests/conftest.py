@@ -0,0 +1,60 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from db_instance import db  # noqa: E402
+from models import News, User, recount_news  # noqa: E402
+from utils.hashing import password_hasher  # noqa: E402
+
+PASSWORD = 'password'
+
+
+@pytest.fixture
+def app():
+    """Приложение с профилем testing на своей in-memory базе."""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def add_users(count, prefix='user'):
+    """Создаёт пользователей одним INSERT (все с паролем PASSWORD) и возвращает их id."""
+    password_hash = password_hasher.hash(PASSWORD)
+    first_id = (db.session.scalar(db.select(db.func.max(User.id))) or 0) + 1
+    db.session.execute(db.insert(User), [{
+        'first_name': f'Имя{i}',
+        'last_name': f'Фамилия{i}',
+        'email': f'{prefix}-{i}@example.com',
+        'password': password_hash,
+    } for i in range(first_id, first_id + count)])
+    db.session.commit()
+    return list(range(first_id, first_id + count))
+
+
+def add_news(user_ids, per_user=1):
+    """Создаёт по per_user новостей на каждого пользователя."""
+    db.session.execute(db.insert(News), [{
+        'title': f'Новость {user_id}-{i}',
+        'content': 'Текст новости',
+        'user_id': user_id,
+    } for user_id in user_ids for i in range(per_user)])
+    recount_news(db.session)
+    db.session.commit()
+
+
+def login(client, email):
+    response = client.post('/login', data={'email': email, 'password': PASSWORD})
+    assert response.status_code == 302
@@ -0,0 +1,89 @@
+# tests/test_app.py
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from config import TestingConfig
+from conftest import add_users, login
+from db_instance import db
+
+
+class ReinitConfig(TestingConfig):
+    NEWS_GROUP_COMMIT_ENABLED = True
+    NEWS_GROUP_COMMIT_TIMEOUT = 2
+    NEWS_STREAM_POLL_INTERVAL = 0.1
+    NEWS_STREAM_HEARTBEAT = 1
+
+
+@pytest.fixture
+def make_app():
+    apps = []
+
+    def make(config='testing'):
+        app = create_app(config)
+        with app.app_context():
+            add_users(1)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+def next_event(response, max_pings=3):
+    """Следующее событие потока SSE; None - сервер закрыл поток."""
+    pings = 0
+    for chunk in response.response:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if text.startswith('id: '):
+            return text
+        if text.startswith(': ping'):
+            pings += 1
+            assert pings < max_pings, 'поток открыт, но событий нет'
+    return None
+
+
+def hashing_threads(limit, timeout=5):
+    """Число потоков пулов хеширования; ждёт, пока остановленные пулы их завершат."""
+    deadline = time.monotonic() + timeout
+    while True:
+        count = sum(thread.name.startswith('password-hash') for thread in threading.enumerate())
+        if count <= limit or time.monotonic() > deadline:
+            return count
+        time.sleep(0.05)
+
+
+def test_create_app_twice_does_not_duplicate_metrics(make_app):
+    for application in (make_app(), make_app()):
+        lines = application.test_client().get('/metrics').get_data(as_text=True).splitlines()
+        samples = [line for line in lines if line.startswith('cache_hits_total{cache="response"}')]
+        assert len(samples) == 1
+
+
+def test_second_app_serves_login_writes_and_stream(make_app):
+    first = make_app(ReinitConfig)
+    first_client = first.test_client()
+    login(first_client, 'user-1@example.com')
+    assert first_client.post('/api/news', json={'title': 'Первая', 'content': 'Текст'}).status_code == 201
+    first_stream = first_client.get('/api/news/stream')
+
+    second = make_app(ReinitConfig)
+    client = second.test_client()
+    login(client, 'user-1@example.com')
+    stream = client.get('/api/news/stream')
+    try:
+        assert client.post('/api/news', json={'title': 'Вторая', 'content': 'Текст'}).status_code == 201
+        assert '"Вторая"' in next_event(stream)
+        # Поток первого приложения закрывается, а не получает события из базы второго
+        assert next_event(first_stream) is None
+    finally:
+        stream.close()
+        first_stream.close()
+
+    # Пулы хеширования прежних приложений остановлены: их потоки не копятся
+    assert hashing_threads(second.config['PASSWORD_HASH_WORKERS']) <= second.config['PASSWORD_HASH_WORKERS']
@@ -0,0 +1,47 @@
+# tests/test_caching.py
+"""Валидаторы и кеши не должны путать удалённую новость с новой."""
+from conftest import add_news, add_users, login
+from db_instance import db
+from models import News, bump_table_version
+from utils.cache import fragment_cache, response_cache
+
+
+def test_new_news_does_not_reuse_deleted_id(app, client):
+    add_users(1)
+    login(client, 'user-1@example.com')
+    first = client.post('/api/news', json={'title': 'Первая', 'content': 'Текст'}).get_json()
+    old = client.get(f"/api/news/{first['id']}")
+
+    assert client.delete(f"/api/news/{first['id']}").status_code == 204
+    second = client.post('/api/news', json={'title': 'Вторая', 'content': 'Другой текст'}).get_json()
+    assert second['id'] != first['id']
+
+    response = client.get(f"/api/news/{second['id']}", headers={'If-None-Match': old.headers['ETag']})
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Вторая'
+
+
+def test_index_drops_fragments_of_deleted_news(app, client):
+    add_users(1)
+    login(client, 'user-1@example.com')
+    first = client.post('/api/news', json={'title': 'Удаляемая', 'content': 'Старый текст'}).get_json()
+    assert 'Удаляемая' in client.get('/').get_data(as_text=True)
+
+    client.delete(f"/api/news/{first['id']}")
+    assert not any(key[1] == first['id'] for key in fragment_cache._data)
+
+    client.post('/api/news', json={'title': 'Новая', 'content': 'Новый текст'})
+    html = client.get('/').get_data(as_text=True)
+    assert 'Новая' in html and 'Удаляемая' not in html
+
+
+def test_index_cache_follows_table_version(app, client):
+    # Изменение из другого процесса: локальный сброс кеша не происходит, меняется только версия таблицы
+    response_cache.configure(enabled=True)
+    add_news(add_users(1))
+    assert 'Новость 1-0' in client.get('/').get_data(as_text=True)
+
+    db.session.execute(db.update(News).values(title='Изменена другим процессом', revision=News.revision + 1))
+    bump_table_version(db.session, 'news')
+    db.session.commit()
+    assert 'Изменена другим процессом' in client.get('/').get_data(as_text=True)
@@ -0,0 +1,10 @@
+# tests/test_changefeed.py
+from utils.changefeed import broadcaster
+
+
+def test_stream_rejects_subscribers_over_limit(app, client):
+    broadcaster.max_subscribers = 0
+    response = client.get('/api/news/stream')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app.config['NEWS_STREAM_HEARTBEAT'])
+    assert broadcaster.stats()['subscribers'] == 0
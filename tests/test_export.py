@@ -0,0 +1,18 @@
+# tests/test_export.py
+import pytest
+
+from conftest import add_news, add_users
+
+
+@pytest.mark.parametrize('query', ['user_id=abc', 'user_id=', 'after=x'])
+def test_export_rejects_invalid_filters(app, client, query):
+    add_news(add_users(2))
+    response = client.get(f'/api/news/export?{query}')
+    assert response.status_code == 400
+
+
+def test_export_filters_by_user(app, client):
+    first, second = add_users(2)
+    add_news([first, second], per_user=2)
+    lines = client.get(f'/api/news/export?user_id={second}').get_data(as_text=True).splitlines()
+    assert len(lines) == 2
@@ -0,0 +1,20 @@
+# tests/test_hashing.py
+from conftest import PASSWORD, add_users
+from db_instance import db
+from models import User
+from utils.hashing import password_hasher
+
+
+def test_short_method_name_does_not_rehash_on_login(app, client):
+    # werkzeug дописывает к 'scrypt' параметры по умолчанию: 'scrypt:32768:8:1'
+    app.config['PASSWORD_HASH_METHOD'] = 'scrypt'
+    password_hasher.init_app(app)
+    user_id, = add_users(1)
+    stored = db.session.get(User, user_id).password
+    assert stored.startswith('scrypt:32768:8:1$')
+    assert not password_hasher.needs_rehash(stored)
+
+    response = client.post('/login', data={'email': 'user-1@example.com', 'password': PASSWORD})
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert db.session.get(User, user_id).password == stored
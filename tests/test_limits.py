@@ -0,0 +1,37 @@
+# tests/test_limits.py
+import pytest
+
+from app import create_app
+from config import TestingConfig
+from db_instance import db
+
+
+class ProxiedConfig(TestingConfig):
+    ADMISSION_CONTROL_ENABLED = True
+    TRUSTED_PROXY_COUNT = 1
+    ADMISSION_RATE_LIMITS = {'auth': {'client': (0.001, 2)}}
+
+
+@pytest.fixture
+def proxied_app():
+    app = create_app(ProxiedConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def login_attempt(client, forwarded_for):
+    return client.post('/login', data={'email': 'nobody@example.com', 'password': 'x'},
+                       headers={'X-Forwarded-For': forwarded_for})
+
+
+def test_rate_limit_per_client_behind_proxy(proxied_app):
+    client = proxied_app.test_client()
+    assert [login_attempt(client, '203.0.113.1').status_code for _ in range(3)] == [302, 302, 429]
+    # Тот же адрес прокси, другой клиент - своя корзина
+    assert login_attempt(client, '203.0.113.2').status_code == 302
+
+    response = login_attempt(client, '203.0.113.1')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
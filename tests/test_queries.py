@@ -0,0 +1,60 @@
+# tests/test_queries.py
+"""Число SQL-запросов на список новостей не должно зависеть от числа новостей (нет N+1 по авторам)."""
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import event
+
+from conftest import ROOT, add_news, add_users
+from db_instance import db
+
+
+def count_statements(client, path):
+    statements = []
+
+    def on_execute(*args):
+        statements.append(args[2])
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+@pytest.mark.parametrize('path', ['/index?limit=50', '/api/news?limit=50'])
+def test_news_list_statement_count_is_constant(app, client, path):
+    # У каждой новости свой автор: ленивая загрузка автора дала бы по SELECT на новость
+    add_news(add_users(3))
+    few = count_statements(client, path)
+    add_news(add_users(30))
+    many = count_statements(client, path)
+    assert few == many
+
+
+def test_single_news_statement_count(app, client):
+    add_news(add_users(1))
+    assert count_statements(client, '/api/news/1') <= 3
+
+
+def test_author_relationship_in_fresh_process(tmp_path):
+    """
+    Профиль production не создаёт схему при старте, и ORM-запросов до первого запроса нет.
+    News.author должен быть доступен и без предварительной настройки мапперов.
+    """
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{tmp_path / "app.db"}', APP_CONFIG='production',
+               LOG_LEVEL='WARNING', ADMISSION_CONTROL='0')
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'wsgi', 'init-db'],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    script = (
+        'from wsgi import app\n'
+        'client = app.test_client()\n'
+        'print(client.get("/").status_code, client.get("/api/news").status_code)\n'
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True)
+    assert result.stdout.split() == ['200', '200']
@@ -0,0 +1,84 @@
+# tests/test_schema.py
+"""Каскадное удаление новостей пользователя на стороне БД и миграция старых баз."""
+import sqlite3
+import time
+import tracemalloc
+
+from sqlalchemy import inspect
+
+from app import create_app
+from config import TestingConfig
+from conftest import add_news, add_users, login
+from db_instance import db
+from models import News, User
+
+
+def test_delete_user_with_many_news_is_bounded(app, client):
+    author, other = add_users(2)
+    add_news([author], per_user=100000)
+    add_news([other])
+    login(client, 'user-1@example.com')
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.delete(f'/api/users/{author}')
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert response.status_code == 204
+    # Новости не загружаются в сессию: загрузка 100k объектов заняла бы сотни МБ и десятки секунд
+    assert elapsed < 10
+    assert peak < 20 * 1024 * 1024
+    db.session.expire_all()
+    assert db.session.scalar(db.select(db.func.count(News.id))) == 1
+    assert db.session.get(User, other).news_count == 1
+
+
+OLD_SCHEMA = '''
+CREATE TABLE user (
+    id INTEGER NOT NULL, first_name VARCHAR(50) NOT NULL, last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL, password VARCHAR(128) NOT NULL,
+    PRIMARY KEY (id), UNIQUE (email)
+);
+CREATE TABLE news (
+    id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, content TEXT NOT NULL, user_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id)
+);
+INSERT INTO user VALUES (1, 'Иван', 'Иванов', 'ivan@example.com', 'x'), (2, 'Анна', 'Петрова', 'anna@example.com', 'x');
+INSERT INTO news VALUES (1, 'Первая', 'Текст', 1), (2, 'Вторая', 'Текст', 1), (3, 'Третья', 'Текст', 2);
+-- новость пользователя, удалённого без каскада
+INSERT INTO news VALUES (4, 'Сирота', 'Текст', 99);
+'''
+
+
+def test_upgrade_old_schema(tmp_path):
+    path = tmp_path / 'app.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(OLD_SCHEMA)
+
+    class OldDatabaseConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    app = create_app(OldDatabaseConfig)
+    with app.app_context():
+        inspector = inspect(db.engine)
+        foreign_keys = inspector.get_foreign_keys('news')
+        assert [fk['options'].get('ondelete') for fk in foreign_keys] == ['CASCADE']
+        assert 'ix_news_user_id_id' in {index['name'] for index in inspector.get_indexes('news')}
+        assert {'revision', 'updated_at'} <= {column['name'] for column in inspector.get_columns('news')}
+
+        assert db.session.scalars(db.select(News.id).order_by(News.id)).all() == [1, 2, 3]
+        assert [user.news_count for user in db.session.scalars(db.select(User).order_by(User.id))] == [2, 1]
+
+        db.session.delete(db.session.get(User, 1))
+        db.session.commit()
+        assert db.session.scalars(db.select(News.id)).all() == [3]
+        # id удалённых новостей не выдаются повторно
+        news = News(title='Новая', content='Текст', user_id=2)
+        db.session.add(news)
+        db.session.commit()
+        assert news.id == 5
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,59 @@
+# tests/test_write_queue.py
+import pytest
+
+from app import create_app
+from config import TestingConfig
+from conftest import add_users, login
+from db_instance import db
+from models import News
+
+
+class GroupCommitConfig(TestingConfig):
+    NEWS_GROUP_COMMIT_ENABLED = True
+    NEWS_GROUP_COMMIT_TIMEOUT = 2
+
+
+@pytest.fixture
+def make_app():
+    apps = []
+
+    def make():
+        app = create_app(GroupCommitConfig)
+        with app.app_context():
+            add_users(1)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+def post_news(app, title):
+    client = app.test_client()
+    login(client, 'user-1@example.com')
+    return client.post('/api/news', json={'title': title, 'content': 'Текст новости'})
+
+
+def news_titles(app):
+    with app.app_context():
+        return db.session.scalars(db.select(News.title).order_by(News.id)).all()
+
+
+def test_group_commit_writes_news(make_app):
+    app = make_app()
+    assert post_news(app, 'Первая').status_code == 201
+    assert post_news(app, 'Вторая').status_code == 201
+    assert news_titles(app) == ['Первая', 'Вторая']
+
+
+def test_group_commit_after_second_create_app(make_app):
+    first = make_app()
+    assert post_news(first, 'Первая').status_code == 201
+    # Писатель первого приложения уже запущен: записи второго должны идти в его базу, а не ждать до 503
+    second = make_app()
+    assert post_news(second, 'Вторая').status_code == 201
+    assert news_titles(first) == ['Первая']
+    assert news_titles(second) == ['Вторая']
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру LRU-кеш с временем жизни записей.
+
+    К записи можно привязать теги и затем сбросить все записи с тегом разом
+    (например, все страницы списка новостей). Потокобезопасен.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=60, enabled=True):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set(keys)
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize=None, ttl=None, enabled=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            if enabled is not None:
+                self.enabled = enabled
+            self._clear()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags=()):
+        if not self.enabled:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _clear(self):
+        self._data.clear()
+        self._tags.clear()
+
+    def _remove(self, key):
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# Кеш готовых (сериализованных) ответов публичных GET-маршрутов
+response_cache = TTLCache('response')
+
+# Кеш отрисованных фрагментов шаблонов (новости на главной странице)
+fragment_cache = TTLCache('fragment', maxsize=10000, ttl=600)
+
+# Кеш пользователей для загрузчика Flask-Login: id -> models.UserIdentity
+user_cache = TTLCache('user')
+
+
+def invalidate_news(news_id=None, user_id=None):
+    """
+    Сбрасывает закешированные ответы после изменения новостей:
+    все страницы списков и, если указано, конкретную новость или все новости автора
+    (вместе с их фрагментами главной страницы).
+    """
+    response_cache.invalidate_tag('news:list')
+    if news_id is not None:
+        response_cache.invalidate_tag(f'news:{news_id}')
+        fragment_cache.invalidate_tag(f'news:{news_id}')
+    if user_id is not None:
+        response_cache.invalidate_tag(f'user:{user_id}:news')
+        fragment_cache.invalidate_tag(f'user:{user_id}:news')
+
+
+def invalidate_user(user_id):
+    """Сбрасывает закешированного пользователя после изменения профиля, пароля или удаления."""
+    user_cache.invalidate(user_id)
+
+
+def cache_collector(*caches):
+    """Показатели кешей для utils.metrics: попадания, промахи, вытеснения и размер."""
+    def collect():
+        for cache in caches:
+            stats = cache.stats()
+            labels = {'cache': cache.name}
+            yield 'cache_hits_total', 'counter', labels, stats['hits']
+            yield 'cache_misses_total', 'counter', labels, stats['misses']
+            yield 'cache_evictions_total', 'counter', labels, stats['evictions']
+            yield 'cache_entries', 'gauge', labels, stats['size']
+    return collect
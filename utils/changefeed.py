@@ -0,0 +1,228 @@
+import queue
+import threading
+from datetime import timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from db_instance import db
+from models import News, NewsChange, User, utcnow
+
+
+class ChangesExpired(Exception):
+    """Курсор указывает на записи журнала, которые уже удалены очисткой."""
+
+
+class TooManySubscribers(Exception):
+    """Достигнут лимит подписчиков потока в этом процессе (NEWS_STREAM_MAX_SUBSCRIBERS)."""
+
+
+def latest_change_id():
+    return db.session.scalar(db.select(db.func.max(NewsChange.id))) or 0
+
+
+def fetch_changes(since, limit):
+    """
+    Записи журнала с id > since по возрастанию вместе с текущим состоянием новости
+    (None, если новость уже удалена). Бросает ChangesExpired, если часть записей после since очищена.
+    """
+    if since:
+        oldest = db.session.scalar(db.select(db.func.min(NewsChange.id)))
+        if oldest is not None and since < oldest - 1:
+            raise ChangesExpired()
+
+    rows = db.session.execute(
+        db.select(NewsChange.id, NewsChange.news_id, NewsChange.op, NewsChange.created_at,
+                  News.title, News.content, News.user_id, User.first_name, User.last_name)
+        .outerjoin(News, News.id == NewsChange.news_id)
+        .outerjoin(User, News.user_id == User.id)
+        .where(NewsChange.id > since)
+        .order_by(NewsChange.id)
+        .limit(limit)
+    ).all()
+    return [{
+        'id': row.id,
+        'news_id': row.news_id,
+        'op': row.op,
+        'created_at': row.created_at,
+        'news': None if row.user_id is None else {
+            'id': row.news_id,
+            'title': row.title,
+            'content': row.content,
+            'user_id': row.user_id,
+            'author': f'{row.first_name} {row.last_name}',
+        },
+    } for row in rows]
+
+
+def prune_changes(days):
+    """Удаляет записи журнала старше days дней. Возвращает число удалённых записей."""
+    result = db.session.execute(
+        db.delete(NewsChange).where(NewsChange.created_at < utcnow() - timedelta(days=days))
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def format_event(change, dumps):
+    """Событие SSE; id события - курсор для заголовка Last-Event-ID при переподключении."""
+    return f"id: {change['id']}\nevent: news\ndata: {dumps(change)}\n\n"
+
+
+class _Subscriber:
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.lagging = False
+
+
+class ChangeBroadcaster:
+    """
+    Рассылка журнала изменений подписчикам SSE.
+
+    Базу опрашивает один фоновый поток на процесс (раз в NEWS_STREAM_POLL_INTERVAL секунд или
+    сразу после коммита с изменениями новостей в этом процессе) и раскладывает уже готовые
+    события по очередям подписчиков. Поток запускается при первом подписчике и завершается,
+    когда подписчиков не остаётся. Подписчик, не успевающий забирать события, отключается -
+    клиент переподключится с Last-Event-ID и дочитает пропущенное из журнала.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.poll_interval = 1.0
+        self.heartbeat = 15
+        self.queue_size = 100
+        self.max_subscribers = 1000
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._subscribers = set()
+        self._thread = None
+        self._last_id = 0
+
+    def init_app(self, app):
+        with self._lock:
+            # Повторная инициализация в том же процессе: подписчики прежнего приложения отключаются
+            # (переподключатся с Last-Event-ID), его поток опроса завершится при следующем пробуждении
+            for subscriber in self._subscribers:
+                subscriber.lagging = True
+            self._subscribers = set()
+            self._thread = None
+            self._last_id = 0
+            self.app = app
+            self.poll_interval = app.config['NEWS_STREAM_POLL_INTERVAL']
+            self.heartbeat = app.config['NEWS_STREAM_HEARTBEAT']
+            self.queue_size = app.config['NEWS_STREAM_QUEUE_SIZE']
+            self.max_subscribers = app.config['NEWS_STREAM_MAX_SUBSCRIBERS']
+        self._wakeup.set()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def subscribe(self):
+        """Регистрирует подписчика; вызывается в контексте приложения. При превышении лимита - TooManySubscribers."""
+        subscriber = _Subscriber(self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers()
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._last_id = latest_change_id()
+                self._thread = threading.Thread(target=self._run, args=(self.app,), name='news-change-broadcaster',
+                                                daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {'subscribers': len(self._subscribers), 'last_id': self._last_id}
+
+    def _run(self, app):
+        # Поток опрашивает базу своего приложения; если init_app заменил поток, этот завершается
+        current = threading.current_thread()
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            with self._lock:
+                if self._thread is not current:
+                    return
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                last_id = self._last_id
+            try:
+                with app.app_context():
+                    changes = fetch_changes(last_id, 500)
+                    events = [(change['id'], format_event(change, app.json.dumps)) for change in changes]
+            except ChangesExpired:
+                with app.app_context():
+                    last_id = latest_change_id()
+                with self._lock:
+                    if self._thread is current:
+                        self._last_id = last_id
+                continue
+            except Exception:
+                app.logger.exception('Ошибка опроса журнала изменений новостей')
+                continue
+            if not events:
+                continue
+            with self._lock:
+                if self._thread is not current:
+                    return
+                self._last_id = events[-1][0]
+                subscribers = list(self._subscribers)
+            for subscriber in subscribers:
+                try:
+                    subscriber.queue.put_nowait(events)
+                except queue.Full:
+                    subscriber.lagging = True
+                    self.unsubscribe(subscriber)
+            if len(changes) == 500:
+                self._wakeup.set()  # журнал прочитан не до конца
+
+    def stream(self, subscriber, backlog, last_id):
+        """
+        Генератор тела ответа SSE: сначала backlog (уже готовые события), затем новые события.
+        К базе не обращается, поэтому не держит соединение из пула.
+        """
+        try:
+            yield f'retry: {int(self.poll_interval * 1000)}\n\n'
+            yield from backlog
+            while True:
+                if subscriber.lagging and subscriber.queue.empty():
+                    return
+                try:
+                    events = subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ': ping\n\n'  # комментарий SSE не даёт прокси закрыть простаивающее соединение
+                    continue
+                for change_id, text in events:
+                    if change_id > last_id:
+                        last_id = change_id
+                        yield text
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broadcaster = ChangeBroadcaster()
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_broadcaster(session):
+    # Изменения этого процесса рассылаются сразу, не дожидаясь очередного опроса
+    if session.info.pop('news_changed', False):
+        broadcaster.notify()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_news_changed(session):
+    session.info.pop('news_changed', None)
+
+
+def changefeed_collector():
+    """Показатели потока изменений для utils.metrics."""
+    def collect():
+        stats = broadcaster.stats()
+        yield 'news_stream_subscribers', 'gauge', {}, stats['subscribers']
+        yield 'news_stream_last_change_id', 'gauge', {}, stats['last_id']
+    return collect
@@ -0,0 +1,97 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Compressor:
+    """
+    Сжатие ответов gzip или brotli (если установлен) по заголовку Accept-Encoding.
+
+    Обычные ответы меньше COMPRESS_MIN_SIZE не сжимаются. Потоковые ответы сжимаются
+    по мере генерации: каждый фрагмент сбрасывается в поток сразу, без буферизации всего ответа.
+    Ответы 204/304, уже сжатые и с неподходящим типом содержимого пропускаются.
+    """
+
+    def __init__(self):
+        self.level = 6
+        self.brotli_quality = 4
+        self.min_size = 500
+        self.mimetypes = ()
+
+    def init_app(self, app):
+        if not app.config['COMPRESS_ENABLED']:
+            return
+        self.level = app.config['COMPRESS_LEVEL']
+        self.brotli_quality = app.config['COMPRESS_BROTLI_QUALITY']
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.mimetypes = frozenset(app.config['COMPRESS_MIMETYPES'])
+        app.after_request(self._after_request)
+
+    def choose_encoding(self, accept_encodings):
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return accept_encodings.best_match(offered)
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31 - формат gzip
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_stream(self, chunks, encoding):
+        """Сжимает поток фрагментов, отдавая сжатые данные после каждого фрагмента."""
+        chunks_iter = (chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks)
+        try:
+            if encoding == 'br':
+                compressor = brotli.Compressor(quality=self.brotli_quality)
+                for chunk in chunks_iter:
+                    data = compressor.process(chunk) + compressor.flush()
+                    if data:
+                        yield data
+                yield compressor.finish()
+            else:
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+                for chunk in chunks_iter:
+                    data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                    if data:
+                        yield data
+                yield compressor.flush()
+        finally:
+            # Закрываем исходный поток (stream_with_context освобождает контекст запроса в close)
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    def _after_request(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self.compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self.compress(data, encoding))
+
+        response.headers['Content-Encoding'] = encoding
+        # Сжатое представление побайтно отличается от исходного - ETag становится слабым
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
@@ -0,0 +1,39 @@
+import os
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from utils.cache import fragment_cache
+
+
+def init_template_caches(app):
+    """
+    Включает кеш байткода Jinja в каталоге JINJA_BYTECODE_CACHE_DIR (по умолчанию instance/jinja_cache),
+    чтобы новые процессы не компилировали шаблоны заново, и настраивает кеш фрагментов.
+    """
+    cache_dir = app.config['JINJA_BYTECODE_CACHE_DIR'] or os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    fragment_cache.configure(maxsize=app.config['FRAGMENT_CACHE_SIZE'],
+                             ttl=app.config['FRAGMENT_CACHE_TTL'],
+                             enabled=app.config['FRAGMENT_CACHE_ENABLED'])
+
+
+def render_news_fragments(jinja_env, news_list):
+    """
+    Возвращает {id новости: HTML} для списка новостей.
+    Ключ включает ревизию, время изменения и имя автора, поэтому изменённая новость или переименованный
+    автор просто дают новый ключ, а устаревшие фрагменты вытесняются по LRU. Время изменения отличает
+    и новую новость от удалённой, даже если id совпал. Удаление сбрасывает фрагменты сразу (invalidate_news).
+    """
+    render = None
+    fragments = {}
+    for news in news_list:
+        key = ('news_item', news.id, news.revision, news.updated_at,
+               news.author.full_name if news.author else None)
+        html = fragment_cache.get(key)
+        if html is None:
+            if render is None:
+                render = jinja_env.get_template('_news_item.html').module.render
+            html = Markup(render(news))
+            fragment_cache.set(key, html, tags=(f'news:{news.id}', f'user:{news.user_id}:news'))
+        fragments[news.id] = html
+    return fragments
@@ -0,0 +1,87 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingBusy(Exception):
+    """Пул хеширования паролей переполнен - запрос нужно отклонить, а не ставить в очередь."""
+
+
+_normalized_methods = {}
+
+
+def normalize_method(method):
+    """
+    Полная запись метода, как её сохраняет werkzeug в префиксе хеша:
+    'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2:sha256' -> 'pbkdf2:sha256:<итерации по умолчанию>'.
+    Значения по умолчанию знает только werkzeug, поэтому один раз хешируем пустую строку.
+    """
+    if method not in _normalized_methods:
+        _normalized_methods[method] = generate_password_hash('', method).split('$', 1)[0]
+    return _normalized_methods[method]
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей в ограниченном пуле потоков или процессов.
+
+    Хеширование намеренно дорогое, поэтому не выполняется в потоке запроса без ограничений:
+    одновременно выполняется не больше workers задач и ждёт не больше queue_limit,
+    остальные запросы сразу получают HashingBusy (503).
+    """
+
+    def __init__(self):
+        self.method = 'scrypt:32768:8:1'
+        self.timeout = None
+        self._executor = None
+        self._slots = None
+        self._pid = None
+
+    def init_app(self, app):
+        self.method = normalize_method(app.config['PASSWORD_HASH_METHOD'])
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        workers = app.config['PASSWORD_HASH_WORKERS']
+        if self._executor is not None and self._pid == os.getpid():
+            # Повторная настройка (ещё одно приложение в процессе): старый пул больше не нужен.
+            # Пул, унаследованный через fork, принадлежит родителю - его не трогаем
+            self._executor.shutdown(wait=False)
+        self._pid = os.getpid()
+        if app.config['PASSWORD_HASH_EXECUTOR'] == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # hashlib отпускает GIL во время pbkdf2/scrypt, поэтому потоков достаточно
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + app.config['PASSWORD_HASH_QUEUE_LIMIT'])
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Хеш создан с другими параметрами (метод, стоимость), чем заданы в конфигурации."""
+        return password_hash.split('$', 1)[0] != self.method
+
+    def _run(self, func, *args):
+        executor, slots = self._executor, self._slots
+        if executor is None:
+            # Вне приложения (скрипты, консоль) считаем в текущем потоке
+            return func(*args)
+
+        if not slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy()
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,173 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import g, request, session
+
+
+class RateLimited(Exception):
+    """Клиент превысил частоту запросов класса маршрута (429)."""
+
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class Overloaded(Exception):
+    """Все места класса маршрута заняты - запрос отклоняется, а не ждёт (503)."""
+
+    def __init__(self, retry_after=1):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """
+    Корзины токенов в памяти процесса: ключ -> (токены, время обновления).
+    Хранится не больше maxsize ключей; давно не обращавшиеся вытесняются (их корзины всё равно полны).
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, rate, burst):
+        """Забирает токен. Возвращает 0, если запрос разрешён, иначе сколько секунд ждать следующего токена."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class AdmissionControl:
+    """
+    Ограничение нагрузки по классам маршрутов (ADMISSION_ROUTE_CLASSES).
+
+    Для каждого класса действуют:
+      - лимит одновременных запросов в процессе (ADMISSION_CONCURRENCY): если место не освободилось
+        за ADMISSION_QUEUE_TIMEOUT, запрос сразу получает 503, а не занимает поток сервера;
+      - корзины токенов на клиента (по адресу) и на пользователя (ADMISSION_RATE_LIMITS): 429.
+        За обратным прокси адрес клиента верен, только если задан TRUSTED_PROXY_COUNT.
+    В обоих случаях в ответе есть Retry-After. Маршруты без класса не ограничиваются.
+    Лимиты действуют в пределах одного рабочего процесса.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.route_classes = {}
+        self.rate_limits = {}
+        self.queue_timeout = 0
+        self.buckets = TokenBuckets()
+        self._slots = {}
+        self._limits = {}
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._admitted = {}
+        self._rejected = {}  # (класс, причина) -> число
+
+    def init_app(self, app):
+        self.enabled = app.config['ADMISSION_CONTROL_ENABLED']
+        if not self.enabled:
+            return
+        self.route_classes = app.config['ADMISSION_ROUTE_CLASSES']
+        self.rate_limits = app.config['ADMISSION_RATE_LIMITS']
+        self.queue_timeout = app.config['ADMISSION_QUEUE_TIMEOUT']
+        self.buckets = TokenBuckets(app.config['ADMISSION_MAX_KEYS'])
+        self._limits = dict(app.config['ADMISSION_CONCURRENCY'])
+        self._slots = {name: threading.BoundedSemaphore(limit) for name, limit in self._limits.items()}
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def route_class(self):
+        """Класс текущего маршрута: сначала ищется 'МЕТОД эндпоинт', затем просто эндпоинт."""
+        endpoint = request.endpoint
+        if endpoint is None:
+            return None
+        return self.route_classes.get(f'{request.method} {endpoint}') or self.route_classes.get(endpoint)
+
+    def _before_request(self):
+        route_class = self.route_class()
+        if route_class is None:
+            return
+        self._check_rate(route_class)
+
+        slots = self._slots.get(route_class)
+        if slots is not None:
+            if not slots.acquire(timeout=self.queue_timeout):
+                self._count_rejected(route_class, 'concurrency')
+                raise Overloaded()
+            g._admission_class = route_class
+        with self._lock:
+            self._admitted[route_class] = self._admitted.get(route_class, 0) + 1
+            if slots is not None:
+                self._in_flight[route_class] = self._in_flight.get(route_class, 0) + 1
+
+    def _check_rate(self, route_class):
+        limits = self.rate_limits.get(route_class) or {}
+        for scope, (rate, burst) in limits.items():
+            if scope == 'user':
+                # Пользователь берётся из сессии Flask-Login, без загрузки из БД: отказ должен стоить дёшево
+                key = session.get('_user_id')
+            else:
+                key = request.remote_addr
+            if key is None:
+                continue
+            wait = self.buckets.take((route_class, scope, key), rate, burst)
+            if wait:
+                self._count_rejected(route_class, f'rate_{scope}')
+                raise RateLimited(math.ceil(wait))
+
+    def _teardown_request(self, exc):
+        route_class = g.pop('_admission_class', None)
+        if route_class is None:
+            return
+        with self._lock:
+            self._in_flight[route_class] -= 1
+        self._slots[route_class].release()
+
+    def _count_rejected(self, route_class, reason):
+        with self._lock:
+            key = (route_class, reason)
+            self._rejected[key] = self._rejected.get(key, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limits': dict(self._limits),
+                'in_flight': dict(self._in_flight),
+                'admitted': dict(self._admitted),
+                'rejected': dict(self._rejected),
+                'rate_keys': len(self.buckets),
+            }
+
+
+admission = AdmissionControl()
+
+
+def admission_collector():
+    """Показатели ограничения нагрузки для utils.metrics."""
+    def collect():
+        stats = admission.stats()
+        for route_class, limit in stats['limits'].items():
+            labels = {'route_class': route_class}
+            yield 'admission_concurrency_limit', 'gauge', labels, limit
+            yield 'admission_in_flight', 'gauge', labels, stats['in_flight'].get(route_class, 0)
+        for route_class, count in stats['admitted'].items():
+            yield 'admission_admitted_total', 'counter', {'route_class': route_class}, count
+        for (route_class, reason), count in stats['rejected'].items():
+            yield 'admission_rejected_total', 'counter', {'route_class': route_class, 'reason': reason}, count
+        yield 'admission_rate_limit_keys', 'gauge', {}, stats['rate_keys']
+    return collect
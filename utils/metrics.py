@@ -0,0 +1,164 @@
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from db_instance import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    items = ','.join(f'{key}="{str(value)}"' for key, value in sorted(labels.items()))
+    return '{' + items + '}'
+
+
+class Metrics:
+    """
+    Инструментирование запросов: время обработки по эндпоинтам, число и время SQL-запросов
+    (через события движка SQLAlchemy) и размер ответов. Данные отдаются в текстовом
+    формате Prometheus на /metrics. Медленные запросы пишутся в лог с разбивкой по SQL.
+
+    Другие модули добавляют свои показатели через register_collector(): функция
+    возвращает кортежи (имя, тип, метки, значение). Функции хранятся в приложении
+    (app.extensions), поэтому повторный create_app в том же процессе не дублирует показатели.
+    """
+
+    def __init__(self):
+        self.slow_threshold = None
+        self._lock = threading.Lock()
+        self._histograms = {}  # (имя, метки) -> Histogram
+        self._logger = None
+
+    def init_app(self, app):
+        if not app.config['METRICS_ENABLED']:
+            return
+        self.slow_threshold = app.config['SLOW_REQUEST_THRESHOLD_MS'] / 1000
+        self._logger = app.logger
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def register_collector(self, app, collector):
+        app.extensions.setdefault('metrics_collectors', []).append(collector)
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    # --- Хуки запроса ---
+
+    def _before_request(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_sql_count = 0
+        g._metrics_sql_time = 0.0
+        g._metrics_sql = {}
+
+    def _after_request(self, response):
+        started = g.get('_metrics_started')
+        if started is None:
+            return response
+        duration = time.perf_counter() - started
+        labels = {'endpoint': request.endpoint or '<unmatched>', 'method': request.method}
+
+        self.observe('http_request_duration_seconds', dict(labels, status=response.status_code),
+                     duration, LATENCY_BUCKETS)
+        self.observe('http_request_sql_statements', labels, g._metrics_sql_count, SQL_COUNT_BUCKETS)
+        self.observe('http_request_sql_duration_seconds', labels, g._metrics_sql_time, LATENCY_BUCKETS)
+        # Размер потоковых ответов заранее неизвестен
+        if not response.is_streamed and response.content_length is not None:
+            self.observe('http_response_size_bytes', labels, response.content_length, SIZE_BUCKETS)
+
+        if duration >= self.slow_threshold:
+            self._log_slow_request(duration)
+        return response
+
+    def _log_slow_request(self, duration):
+        breakdown = sorted(g._metrics_sql.items(), key=lambda item: item[1][1], reverse=True)
+        lines = [f'slow request: {request.method} {request.full_path} {duration * 1000:.1f} ms, '
+                 f'{g._metrics_sql_count} SQL statements in {g._metrics_sql_time * 1000:.1f} ms']
+        for statement, (count, total) in breakdown[:5]:
+            lines.append(f'  {count}x {total * 1000:.1f} ms: {statement}')
+        self._logger.warning('\n'.join(lines))
+
+    # --- События движка ---
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['_metrics_started'].pop()
+        if not has_request_context() or '_metrics_started' not in g:
+            return
+        g._metrics_sql_count += 1
+        g._metrics_sql_time += elapsed
+        # Группируем по началу текста запроса (без параметров)
+        key = ' '.join(statement.split())[:120]
+        stats = g._metrics_sql.setdefault(key, [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+
+    # --- Экспорт ---
+
+    def render(self, collectors=()):
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            snapshot = [(name, dict(labels), list(h.buckets), list(h.counts), h.sum, h.count)
+                        for (name, labels), h in histograms]
+
+        declared = set()
+        for name, labels, buckets, counts, total, count in snapshot:
+            if name not in declared:
+                lines.append(f'# TYPE {name} histogram')
+                declared.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(dict(labels, le=bound))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(dict(labels, le="+Inf"))} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        # Значения одной метрики должны идти подряд
+        samples = [sample for collector in collectors for sample in collector()]
+        for name, kind, labels, value in sorted(samples, key=lambda sample: sample[0]):
+            if name not in declared:
+                lines.append(f'# TYPE {name} {kind}')
+                declared.add(name)
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        body = self.render(current_app.extensions.get('metrics_collectors', ()))
+        return body, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+metrics = Metrics()
@@ -0,0 +1,56 @@
+from db_instance import db
+
+
+def parse_page_args(args, default_limit, max_limit):
+    """
+    Разбирает параметры limit/after/before из строки запроса.
+    Возвращает кортеж (limit, after, before) или бросает ValueError с описанием ошибки.
+    """
+    try:
+        limit = int(args.get('limit', default_limit))
+        after = args.get('after')
+        before = args.get('before')
+        after = int(after) if after is not None else None
+        before = int(before) if before is not None else None
+    except ValueError:
+        raise ValueError('Параметры limit, after и before должны быть целыми числами')
+
+    if limit < 1 or limit > max_limit:
+        raise ValueError(f'Параметр limit должен быть от 1 до {max_limit}')
+    if after is not None and before is not None:
+        raise ValueError('Нельзя одновременно указывать after и before')
+    return limit, after, before
+
+
+def paginate_keyset(query, column, limit, after=None, before=None, rows=False):
+    """
+    Постраничная выборка по ключу (keyset/cursor pagination).
+
+    query - select() по модели, column - уникальный возрастающий столбец (обычно id).
+    rows=True - query выбирает отдельные столбцы, результат - строки (Row), а не объекты моделей.
+    Стоимость запроса не зависит от глубины страницы, в отличие от OFFSET.
+    Возвращает (items, next_cursor, prev_cursor); курсор - значение column.
+    """
+    if before is not None:
+        # Идём назад: берём limit + 1 записей перед курсором в обратном порядке
+        results = _fetch(query.where(column < before).order_by(column.desc()).limit(limit + 1), rows)
+        has_more = len(results) > limit
+        items = list(reversed(results[:limit]))
+        next_cursor = getattr(items[-1], column.key) if items else None
+        prev_cursor = getattr(items[0], column.key) if items and has_more else None
+        return items, next_cursor, prev_cursor
+
+    if after is not None:
+        query = query.where(column > after)
+    results = _fetch(query.order_by(column).limit(limit + 1), rows)
+    has_more = len(results) > limit
+    items = results[:limit]
+    next_cursor = getattr(items[-1], column.key) if items and has_more else None
+    prev_cursor = getattr(items[0], column.key) if items and after is not None else None
+    return items, next_cursor, prev_cursor
+
+
+def _fetch(query, rows):
+    if rows:
+        return db.session.execute(query).all()
+    return db.session.scalars(query).unique().all()
@@ -0,0 +1,121 @@
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import AddConstraint, CreateTable
+from db_instance import db
+from models import News, NewsChange, TableVersion, User, recount_news
+from utils.search import ensure_search_index, search_supported
+
+
+def _news_fk_cascades(inspector):
+    return any(
+        fk['referred_table'] == 'user' and (fk.get('options') or {}).get('ondelete', '').upper() == 'CASCADE'
+        for fk in inspector.get_foreign_keys('news')
+    )
+
+
+def _news_autoincrement(conn):
+    table_sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'news'")).scalar()
+    return 'AUTOINCREMENT' in (table_sql or '').upper()
+
+
+def _rebuild_news_table(conn):
+    """
+    SQLite не умеет менять внешний ключ и AUTOINCREMENT через ALTER TABLE, поэтому таблица news
+    пересоздаётся по текущей модели: новая таблица, копирование строк (с теми же id), замена старой.
+    Новости удалённых ранее пользователей (осиротевшие строки) не переносятся.
+    """
+    metadata = MetaData()
+    User.__table__.to_metadata(metadata)  # нужна для разрешения ссылки user.id
+    new_table = News.__table__.to_metadata(metadata, name='news__new')
+    columns = ', '.join(column.name for column in News.__table__.columns)
+
+    conn.execute(CreateTable(new_table))
+    conn.execute(text(
+        f'INSERT INTO news__new ({columns}) SELECT {columns} FROM news '
+        'WHERE user_id IN (SELECT id FROM user)'
+    ))
+    # Счётчик AUTOINCREMENT начнётся после всех известных id: и непереносимых осиротевших строк,
+    # и удалённых новостей из журнала изменений
+    max_id = max(conn.execute(text('SELECT coalesce(max(id), 0) FROM news')).scalar(),
+                 conn.execute(db.select(db.func.max(NewsChange.news_id))).scalar() or 0)
+    conn.execute(text('DROP TABLE news'))  # вместе с таблицей удаляются её индексы и триггеры поиска
+    conn.execute(text('ALTER TABLE news__new RENAME TO news'))
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'news'"))
+    conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('news', :max_id)"), {'max_id': max_id})
+
+
+def _upgrade_news_table(conn):
+    """
+    Переводит news.user_id на ON DELETE CASCADE, а в SQLite ещё и id на AUTOINCREMENT.
+    Возвращает True, если таблица была пересоздана.
+    """
+    inspector = inspect(conn)
+    if conn.dialect.name == 'sqlite':
+        if _news_fk_cascades(inspector) and _news_autoincrement(conn):
+            return False
+        _rebuild_news_table(conn)
+        return True
+    if _news_fk_cascades(inspector):
+        return False
+    for fk in inspector.get_foreign_keys('news'):
+        if fk['referred_table'] == 'user' and fk.get('name'):
+            conn.execute(text(f'ALTER TABLE news DROP CONSTRAINT {fk["name"]}'))
+    for constraint in News.__table__.foreign_key_constraints:
+        conn.execute(AddConstraint(constraint))
+    return False
+
+
+def _widen_password_column(conn, inspector):
+    """Поле password расширено до 256 символов: хеши scrypt не помещаются в 128. SQLite длину не проверяет."""
+    if conn.dialect.name == 'sqlite':
+        return
+    column = next(column for column in inspector.get_columns('user') if column['name'] == 'password')
+    length = getattr(column['type'], 'length', None)
+    if length is None or length >= User.__table__.c.password.type.length:
+        return
+    table = conn.dialect.identifier_preparer.quote('user')
+    new_type = User.__table__.c.password.type.compile(dialect=conn.dialect)
+    if conn.dialect.name in ('mysql', 'mariadb'):
+        conn.execute(text(f'ALTER TABLE {table} MODIFY password {new_type} NOT NULL'))
+    else:
+        conn.execute(text(f'ALTER TABLE {table} ALTER COLUMN password TYPE {new_type}'))
+
+
+def upgrade_schema():
+    """
+    Доводит существующую базу до текущей схемы.
+    db.create_all() создаёт только отсутствующие таблицы и не меняет уже существующие.
+    """
+    inspector = inspect(db.engine)
+    news_columns = {column['name'] for column in inspector.get_columns('news')}
+    user_columns = {column['name'] for column in inspector.get_columns('user')}
+
+    with db.engine.begin() as conn:
+        if 'revision' not in news_columns:
+            conn.execute(text('ALTER TABLE news ADD COLUMN revision INTEGER NOT NULL DEFAULT 1'))
+        if 'updated_at' not in news_columns:
+            datetime_type = db.DateTime().compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE news ADD COLUMN updated_at {datetime_type}'))
+            conn.execute(text('UPDATE news SET updated_at = CURRENT_TIMESTAMP'))
+        if 'news_count' not in user_columns:
+            conn.execute(text('ALTER TABLE "user" ADD COLUMN news_count INTEGER NOT NULL DEFAULT 0'))
+            recount_news(conn)
+        _widen_password_column(conn, inspector)
+
+        # Удаление пользователя каскадно удаляет его новости на стороне БД; id новостей не повторяются
+        rebuilt = _upgrade_news_table(conn)
+        # Одиночный индекс по user_id заменён составным (user_id, id)
+        conn.execute(text('DROP INDEX IF EXISTS ix_news_user_id'))
+        for index in News.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+        # Строка счётчика версий должна существовать заранее: запись - это только UPDATE
+        exists = conn.execute(
+            db.select(TableVersion.name).where(TableVersion.name == 'news')
+        ).first()
+        if exists is None:
+            conn.execute(db.insert(TableVersion).values(name='news', version=0))
+
+        ensure_search_index(conn)
+        if rebuilt and search_supported(conn):
+            # Строки, не перенесённые при пересоздании таблицы, нужно убрать и из поискового индекса
+            conn.execute(text("INSERT INTO news_fts(news_fts) VALUES ('rebuild')"))
@@ -0,0 +1,119 @@
+import re
+from markupsafe import escape
+from sqlalchemy import text
+from db_instance import db
+from models import News, User
+
+# Служебные символы для разметки совпадений: после экранирования HTML заменяются на <mark>
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+# Токенизатор unicode61 приводит к нижнему регистру в том числе кириллицу.
+# Диакритику не снимаем, иначе "й" совпадает с "и".
+_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+        title, content, content='news', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 0')""",
+    """CREATE TRIGGER IF NOT EXISTS news_fts_ai AFTER INSERT ON news BEGIN
+        INSERT INTO news_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_fts_ad AFTER DELETE ON news BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_fts_au AFTER UPDATE OF title, content ON news BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO news_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+
+def search_supported(bind=None):
+    return (bind or db.engine).dialect.name == 'sqlite'
+
+
+def ensure_search_index(conn):
+    """
+    Создаёт FTS5-индекс по заголовку и тексту новостей и триггеры синхронизации.
+    Если индекс создаётся для уже заполненной таблицы, он перестраивается.
+    """
+    if not search_supported(conn):
+        return
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'news_fts'")
+    ).first() is not None
+    for statement in _SEARCH_DDL:
+        conn.execute(text(statement))
+    if not existed:
+        conn.execute(text("INSERT INTO news_fts(news_fts) VALUES ('rebuild')"))
+
+
+def rebuild_search_index():
+    """Полностью перестраивает FTS5-индекс по текущему содержимому таблицы news."""
+    with db.engine.begin() as conn:
+        ensure_search_index(conn)
+        conn.execute(text("INSERT INTO news_fts(news_fts) VALUES ('rebuild')"))
+
+
+def build_match_query(query):
+    """
+    Превращает пользовательскую строку в безопасное выражение MATCH:
+    каждое слово берётся в кавычки, слова от трёх букв ищутся по префиксу (грубая замена морфологии).
+    """
+    terms = re.findall(r'\w+', query)
+    parts = []
+    for term in terms:
+        quoted = '"' + term.replace('"', '""') + '"'
+        parts.append(quoted + '*' if len(term) >= 3 else quoted)
+    return ' '.join(parts)
+
+
+def _highlight(value):
+    html = str(escape(value or ''))
+    return html.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_news(query, limit, offset):
+    """
+    Ищет новости, упорядочивая по релевантности (bm25, совпадения в заголовке весомее).
+    Возвращает список словарей с подсвеченными заголовком и фрагментом текста.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    if not search_supported():
+        # Запасной вариант для СУБД без FTS5: поиск подстроки без ранжирования
+        pattern = f'%{query}%'
+        rows = db.session.execute(
+            db.select(News.id, News.title, News.user_id, User.first_name, User.last_name)
+            .join(User, News.user_id == User.id)
+            .where(db.or_(News.title.ilike(pattern), News.content.ilike(pattern)))
+            .order_by(News.id.desc()).limit(limit).offset(offset)
+        ).all()
+        return [{
+            'id': row.id,
+            'title': str(escape(row.title)),
+            'snippet': None,
+            'user_id': row.user_id,
+            'author': f'{row.first_name} {row.last_name}'
+        } for row in rows]
+
+    rows = db.session.execute(text("""
+        SELECT news.id, news.user_id, user.first_name, user.last_name,
+               highlight(news_fts, 0, :mark_start, :mark_end) AS title,
+               snippet(news_fts, 1, :mark_start, :mark_end, '…', 24) AS snippet
+        FROM news_fts
+        JOIN news ON news.id = news_fts.rowid
+        JOIN user ON user.id = news.user_id
+        WHERE news_fts MATCH :match
+        ORDER BY bm25(news_fts, 10.0, 1.0)
+        LIMIT :limit OFFSET :offset
+    """), {'match': match, 'limit': limit, 'offset': offset,
+           'mark_start': _MARK_START, 'mark_end': _MARK_END}).all()
+    return [{
+        'id': row.id,
+        'title': _highlight(row.title),
+        'snippet': _highlight(row.snippet),
+        'user_id': row.user_id,
+        'author': f'{row.first_name} {row.last_name}'
+    } for row in rows]
@@ -0,0 +1,112 @@
+import bisect
+import itertools
+import random
+import time
+from sqlalchemy import text
+from db_instance import db
+from models import News, User, bump_table_version, recount_news, utcnow
+from utils.hashing import password_hasher
+from utils.search import ensure_search_index, search_supported
+
+FIRST_NAMES = ('Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Иван', 'Михаил',
+               'Елена', 'Ольга', 'Анна', 'Мария', 'Татьяна', 'Наталья', 'Ирина', 'Екатерина')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов',
+              'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов', 'Егоров')
+WORDS = (
+    'сегодня', 'вчера', 'в', 'на', 'по', 'для', 'и', 'из', 'после', 'около', 'города', 'области', 'района',
+    'администрация', 'жители', 'депутаты', 'школы', 'больницы', 'дороги', 'парка', 'моста', 'набережной',
+    'заседание', 'совещание', 'решение', 'проект', 'строительство', 'ремонт', 'благоустройство', 'бюджет',
+    'рубли', 'миллионов', 'программы', 'развития', 'культуры', 'спорта', 'транспорта', 'отопления',
+    'прошло', 'состоялось', 'завершился', 'начался', 'обсуждались', 'утвердили', 'открыли', 'представили',
+    'новый', 'городской', 'областной', 'международный', 'ежегодный', 'важный', 'большой', 'зимний',
+    'фестиваль', 'конкурс', 'турнир', 'выставка', 'концерт', 'субботник', 'ярмарка', 'конференция',
+)
+
+
+def _sentence(rng):
+    words = rng.choices(WORDS, k=rng.randint(6, 16))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _author_sampler(rng, user_ids, skew):
+    """
+    Выбор автора по закону Ципфа: вес автора с рангом r равен 1 / r**skew.
+    Немногие авторы пишут большую часть новостей, как в реальных лентах.
+    """
+    ranked = list(user_ids)
+    rng.shuffle(ranked)
+    cum_weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, len(ranked) + 1)))
+    total = cum_weights[-1]
+
+    def sample():
+        return ranked[bisect.bisect(cum_weights, rng.random() * total)]
+    return sample
+
+
+def seed_database(users, news, seed=0, batch_size=10000, password='password', skew=1.1, log=print):
+    """
+    Заполняет базу синтетическими пользователями и новостями для нагрузочных замеров.
+
+    Вставка идёт многострочными INSERT пачками по batch_size с коммитом после каждой.
+    Пароль хешируется один раз - у всех пользователей одинаковый хеш.
+    Данные детерминированы при одинаковом seed. Записи в журнал изменений новостей не попадают.
+    Триггер поискового индекса на время вставки снимается, индекс перестраивается в конце одним проходом,
+    счётчики новостей авторов пересчитываются тоже в конце.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    password_hash = password_hasher.hash(password)
+
+    first_user_id = (db.session.scalar(db.select(db.func.max(User.id))) or 0) + 1
+    for start in range(0, users, batch_size):
+        db.session.execute(db.insert(User), [{
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'email': f'seed-{user_id}@example.com',
+            'password': password_hash,
+        } for user_id in range(first_user_id + start, first_user_id + min(start + batch_size, users))])
+        db.session.commit()
+    log(f'Пользователей: {users} ({time.perf_counter() - started:.1f} с)')
+
+    user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+    if not news:
+        return
+    if not user_ids:
+        raise ValueError('Для новостей нужен хотя бы один пользователь')
+
+    author = _author_sampler(rng, user_ids, skew)
+    # Текст собирается из заранее сгенерированных предложений: так миллион новостей
+    # создаётся за секунды, а длина текста по-прежнему случайна (от абзаца до нескольких)
+    sentences = [_sentence(rng) for _ in range(5000)]
+
+    search_index = search_supported()
+    if search_index:
+        db.session.execute(text('DROP TRIGGER IF EXISTS news_fts_ai'))
+        db.session.commit()
+    try:
+        now = utcnow()
+        for start in range(0, news, batch_size):
+            rows = []
+            for _ in range(min(batch_size, news - start)):
+                rows.append({
+                    'title': rng.choice(sentences)[:100].rstrip('.'),
+                    'content': ' '.join(rng.choices(sentences, k=max(1, int(rng.lognormvariate(2.2, 0.6))))),
+                    'user_id': author(),
+                    'revision': 1,
+                    'updated_at': now,
+                })
+            db.session.execute(db.insert(News), rows)
+            db.session.commit()
+            done = start + len(rows)
+            elapsed = time.perf_counter() - started
+            log(f'Новостей: {done}/{news} ({elapsed:.1f} с)')
+    finally:
+        if search_index:
+            with db.engine.begin() as conn:
+                ensure_search_index(conn)
+                conn.execute(text("INSERT INTO news_fts(news_fts) VALUES ('rebuild')"))
+
+    recount_news(db.session)
+    bump_table_version(db.session, 'news')
+    db.session.commit()
+    log(f'Готово за {time.perf_counter() - started:.1f} с')
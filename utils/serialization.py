@@ -0,0 +1,81 @@
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON-провайдер Flask на orjson (если установлен), иначе стандартный json.
+
+    Результат по смыслу совпадает с DefaultJSONProvider: ключи сортируются, даты, Decimal и
+    прочие нестандартные типы сериализуются той же функцией default. Отличие только в том,
+    что не-ASCII символы пишутся как UTF-8, а не \\uXXXX.
+    """
+
+    def _orjson_option(self):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # В режиме отладки Flask форматирует JSON с отступами - это умеет только стандартный json
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_option())
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def negotiate_format():
+    """Формат ответа API по заголовку Accept: 'msgpack', если клиент его предпочитает, иначе 'json'."""
+    if msgpack is None:
+        return 'json'
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    return 'msgpack' if best == MSGPACK_MIMETYPE else 'json'
+
+
+def encode(payload, fmt):
+    """Сериализует данные в байты выбранного формата."""
+    if fmt == 'msgpack':
+        return msgpack.packb(payload, use_bin_type=True, default=current_app.json.default)
+    provider = current_app.json
+    if isinstance(provider, FastJSONProvider) and orjson is not None:
+        return orjson.dumps(payload, default=provider.default, option=provider._orjson_option()) + b'\n'
+    return (provider.dumps(payload) + '\n').encode()
+
+
+def body_response(body, fmt):
+    """Ответ из уже сериализованного тела (например, из кеша)."""
+    mimetype = MSGPACK_MIMETYPE if fmt == 'msgpack' else 'application/json'
+    response = current_app.response_class(body, mimetype=mimetype)
+    if msgpack is not None:
+        response.vary.add('Accept')
+    return response
+
+
+def api_response(payload):
+    """Аналог jsonify с учётом заголовка Accept (JSON или MessagePack)."""
+    fmt = negotiate_format()
+    return body_response(encode(payload, fmt), fmt)
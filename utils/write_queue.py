@@ -0,0 +1,138 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from db_instance import db
+from models import News, adjust_news_count, bump_table_version, record_news_changes
+from utils.cache import invalidate_news
+
+
+class WriteQueueBusy(Exception):
+    """Очередь записи переполнена или запись не завершилась за отведённое время."""
+
+
+class GroupCommitWriter:
+    """
+    Групповая фиксация новых новостей (NEWS_GROUP_COMMIT_ENABLED).
+
+    Запросы не пишут в БД сами, а ставят новость в очередь и ждут результата. Фоновый поток
+    собирает всё, что пришло за NEWS_GROUP_COMMIT_WINDOW_MS (но не больше NEWS_GROUP_COMMIT_MAX_BATCH),
+    и записывает пачку одной транзакцией: один захват блокировки записи SQLite и один fsync
+    вместо одного на каждую новость. Каждый запрос получает свой id или свою ошибку: если
+    транзакция пачки не удалась, новости записываются по одной, и ошибка достаётся только виновной.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.window = 0.005
+        self.max_batch = 100
+        self.timeout = 5
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        with self._lock:
+            # Повторная инициализация в том же процессе: писатель прежнего приложения записывает
+            # уже поставленные новости и завершается, следующая запись запустит новый
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                self._queue.put(None)
+            self._thread = None
+            self.app = app
+            self.enabled = app.config['NEWS_GROUP_COMMIT_ENABLED']
+            self.window = app.config['NEWS_GROUP_COMMIT_WINDOW_MS'] / 1000
+            self.max_batch = app.config['NEWS_GROUP_COMMIT_MAX_BATCH']
+            self.timeout = app.config['NEWS_GROUP_COMMIT_TIMEOUT']
+            self._queue = queue.Queue(maxsize=app.config['NEWS_GROUP_COMMIT_QUEUE_LIMIT'])
+
+    def add_news(self, title, content, user_id):
+        """Ставит новость в очередь и ждёт её записи. Возвращает id новости."""
+        self._ensure_thread()
+        future = Future()
+        try:
+            self._queue.put_nowait(({'title': title, 'content': content, 'user_id': user_id}, future))
+        except queue.Full:
+            raise WriteQueueBusy()
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Новость ещё в очереди - снимаем её, иначе повтор запроса после 503 создаст дубликат.
+            # Если писатель уже взял её в работу, отменить нельзя: дожидаемся результата
+            if future.cancel():
+                raise WriteQueueBusy()
+            return future.result()
+
+    def _ensure_thread(self):
+        # Поток запускается при первой записи; после fork в дочернем процессе его нет - запускаем заново
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                if self._pid is not None:
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self.app, self._queue),
+                                                name='news-group-commit', daemon=True)
+                self._thread.start()
+
+    def _collect(self, items):
+        batch = [items.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(items.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, app, items):
+        # Поток работает со своими приложением и очередью: init_app может заменить их, пока он дописывает
+        while True:
+            batch = self._collect(items)
+            stop = batch[-1] is None  # init_app остановил писателя
+            if stop:
+                batch.pop()
+            # Новости, чьи запросы уже получили 503 по таймауту, не записываются
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                with app.app_context():
+                    try:
+                        self._write(batch)
+                    except Exception:
+                        db.session.rollback()
+                        self._write_each(batch)
+                invalidate_news()
+            if stop:
+                return
+
+    def _write(self, batch):
+        rows = [row for row, _ in batch]
+        ids = db.session.scalars(
+            db.insert(News).returning(News.id, sort_by_parameter_order=True), rows
+        ).all()
+        counts = {}
+        for row in rows:
+            counts[row['user_id']] = counts.get(row['user_id'], 0) + 1
+        bump_table_version(db.session, 'news')
+        record_news_changes(db.session, 'create', ids)
+        adjust_news_count(db.session, counts)
+        db.session.commit()
+        for (_, future), news_id in zip(batch, ids):
+            future.set_result(news_id)
+
+    def _write_each(self, batch):
+        for item in batch:
+            try:
+                self._write([item])
+            except Exception as e:
+                db.session.rollback()
+                item[1].set_exception(e)
+
+
+news_writer = GroupCommitWriter()
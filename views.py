@@ -0,0 +1,182 @@
+# views.py
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, session, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+from sqlalchemy.orm import joinedload
+from db_instance import db
+from forms import LoginForm, NewsForm, RegistrationForm
+from models import News, User, table_version
+from utils.cache import invalidate_news, invalidate_user, response_cache
+from utils.fragments import render_news_fragments
+from utils.hashing import HashingBusy
+from utils.limits import Overloaded, RateLimited
+from utils.pagination import paginate_keyset, parse_page_args
+
+main_bp = Blueprint('main', __name__)
+
+
+# --- Фронтенд маршруты ---
+
+@main_bp.route('/')
+@main_bp.route('/index')
+def index():
+    # Получаем одну страницу новостей; при некорректных параметрах показываем первую страницу
+    try:
+        limit, after, before = parse_page_args(request.args, current_app.config['NEWS_PER_PAGE'],
+                                               current_app.config['MAX_PER_PAGE'])
+    except ValueError:
+        limit, after, before = current_app.config['NEWS_PER_PAGE'], None, None
+
+    # Страница одинакова для всех анонимных посетителей, если нет flash-сообщений.
+    # Версия таблицы в ключе: сброс кеша виден только своему процессу, а версия меняется для всех
+    cacheable = current_user.is_anonymous and '_flashes' not in session
+    if cacheable:
+        version, _ = table_version(db.session, 'news')
+        cache_key = ('index', version, limit, after, before)
+        html = response_cache.get(cache_key)
+        if html is not None:
+            return html
+
+    # Шаблон выводит имя автора каждой новости - загружаем авторов одним запросом
+    query = db.select(News).options(joinedload(News.author))
+    news_list, next_cursor, prev_cursor = paginate_keyset(query, News.id, limit, after, before)
+    html = render_template('index.html', title='Главная', news=news_list,
+                           fragments=render_news_fragments(current_app.jinja_env, news_list),
+                           next_cursor=next_cursor, prev_cursor=prev_cursor)
+    if cacheable:
+        response_cache.set(cache_key, html, tags=('news:list',))
+    return html
+
+@main_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('.index'))
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=form.email.data).first()
+        if user is None or not user.check_password(form.password.data):
+            flash('Неправильный email или пароль')
+            return redirect(url_for('.login'))
+        if user.password_needs_rehash():
+            # Хеш создан со старыми параметрами - пересчитываем, пока пароль известен
+            user.set_password(form.password.data)
+            db.session.commit()
+            invalidate_user(user.id)
+        login_user(user, remember=form.remember_me.data)
+        flash('Вы успешно вошли в систему!')
+        return redirect(url_for('.index'))
+    return render_template('login.html', title='Вход', form=form)
+
+@main_bp.route('/logout')
+def logout():
+    logout_user()
+    flash('Вы вышли из системы.')
+    return redirect(url_for('.index'))
+
+@main_bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('.index'))
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(first_name=form.first_name.data,
+                    last_name=form.last_name.data,
+                    email=form.email.data)
+        user.set_password(form.password.data)
+        db.session.add(user)
+        db.session.commit()
+        flash('Поздравляем, вы успешно зарегистрированы!')
+        return redirect(url_for('.login'))
+    return render_template('register.html', title='Регистрация', form=form)
+
+@main_bp.route('/add_news', methods=['GET', 'POST'])
+@login_required
+def add_news():
+    form = NewsForm()
+    if form.validate_on_submit():
+        news = News(title=form.title.data, content=form.content.data, user_id=current_user.id)
+        db.session.add(news)
+        db.session.commit()
+        invalidate_news()
+        flash('Ваша новость успешно добавлена!')
+        return redirect(url_for('.index'))
+    return render_template('add_news.html', title='Добавить новость', form=form)
+
+@main_bp.route('/edit_news/<int:news_id>', methods=['GET', 'POST'])
+@login_required
+def edit_news(news_id):
+    news = db.session.get(News, news_id)
+    if news is None:
+        flash('Новость не найдена.')
+        return redirect(url_for('.index'))
+
+    if news.user_id != current_user.id:
+        flash('Вы можете редактировать только свои новости.')
+        return redirect(url_for('.index'))
+
+    form = NewsForm()
+    if form.validate_on_submit():
+        news.title = form.title.data
+        news.content = form.content.data
+        db.session.commit()
+        invalidate_news(news_id)
+        flash('Ваша новость успешно обновлена!')
+        return redirect(url_for('.index'))
+    elif request.method == 'GET':
+        form.title.data = news.title
+        form.content.data = news.content
+    return render_template('edit_news.html', title='Редактировать новость', form=form)
+
+@main_bp.route('/delete_news/<int:news_id>', methods=['POST'])
+@login_required
+def delete_news(news_id):
+    news = db.session.get(News, news_id)
+    if news is None:
+        flash('Новость не найдена.')
+        return redirect(url_for('.index'))
+
+    if news.user_id != current_user.id:
+        flash('Вы можете удалить только свои новости.')
+        return redirect(url_for('.index'))
+
+    db.session.delete(news)
+    db.session.commit()
+    invalidate_news(news_id)
+    flash('Новость успешно удалена!')
+    return redirect(url_for('.index'))
+
+
+# --- Обработчики ошибок Flask ---
+@main_bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('404.html'), 404
+
+@main_bp.app_errorhandler(400)
+def bad_request_error(error):
+    return jsonify({'error': 'Bad request', 'details': str(error)}), 400
+
+@main_bp.app_errorhandler(403)
+def forbidden_error(error):
+    return jsonify({'error': 'Forbidden'}), 403
+
+@main_bp.app_errorhandler(HashingBusy)
+def hashing_busy_error(error):
+    response = jsonify({'error': 'Service unavailable', 'details': 'Сервер перегружен, повторите попытку позже'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+@main_bp.app_errorhandler(RateLimited)
+def rate_limited_error(error):
+    response = jsonify({'error': 'Too many requests', 'details': 'Слишком много запросов, повторите попытку позже'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+@main_bp.app_errorhandler(Overloaded)
+def overloaded_error(error):
+    response = jsonify({'error': 'Service unavailable', 'details': 'Сервер перегружен, повторите попытку позже'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+@main_bp.app_errorhandler(500)
+def internal_error(error):
+    db.session.rollback()
+    return render_template('500.html'), 500
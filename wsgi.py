@@ -0,0 +1,11 @@
+# wsgi.py
+"""
+Точка входа WSGI для production-сервера:
+
+    flask --app wsgi init-db
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from app import create_app
+
+app = create_app(os.environ.get('APP_CONFIG') or 'production')